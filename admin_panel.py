@@ -5,62 +5,17 @@ Only admin (you) can access. Complete control over all systems.
 """
 
 from self_heal import self_heal
-import asyncio
+from nft_batch import NFTBatchJob
+from router import parse_command
+from response_cache import ResponseCache
+from outbound import split_message
+from metrics import CommandStats
+from nft_ecosystem import utc_day
+import asyncio, time
 
 ADMIN_ID = 8467779489
 
-class AdminPanel:
-    def __init__(self, catalog, subscriptions, nft_layer, ai_engine):
-        self.catalog = catalog
-        self.subscriptions = subscriptions
-        self.nft = nft_layer
-        self.ai = ai_engine
-
-    def is_admin(self, user_id):
-        return user_id == ADMIN_ID
-
-    async def handle_admin_command(self, event, command_text):
-        if not self.is_admin(event.sender_id):
-            await event.respond("🔒 Admin only. Stay added to the channel.")
-            return
-
-        try:
-            parts = command_text.split()
-            if not parts:
-                return
-
-            action = parts[0].lower()
-
-            if action == "/admin":
-                await self._admin_menu(event)
-            elif action == "/admin_add_section":
-                await self._add_section(event, parts)
-            elif action == "/admin_add_product":
-                await self._add_product(event, parts)
-            elif action == "/admin_update_product":
-                await self._update_product(event, parts)
-            elif action == "/admin_delete_product":
-                await self._delete_product(event, parts)
-            elif action == "/admin_view_menu":
-                await self._view_menu(event)
-            elif action == "/admin_nft_stats":
-                await self._nft_stats(event)
-            elif action == "/admin_ai_memory":
-                await self._ai_memory(event)
-            elif action == "/admin_ecosystem_stats":
-                await self._ecosystem_stats(event)
-            elif action == "/admin_subscribers":
-                await self._view_subscribers(event)
-            elif action == "/admin_notify":
-                await self._notify_subscribers(event, parts)
-            else:
-                await event.respond("❓ Unknown command. /admin for menu")
-        except Exception as e:
-            self_heal(f"Admin command failed: {e}")
-            await event.respond("⚠️ Command error. Self-heal activated.")
-
-    async def _admin_menu(self, event):
-        menu = """
+ADMIN_MENU = """
 🔐 **ADMIN CONTROL PANEL**
 ━━━━━━━━━━━━━━━━━━━━━━━━
 
@@ -73,22 +28,95 @@ class AdminPanel:
 
 🎨 **NFT ECOSYSTEM**
 /admin_nft_stats
+/admin_nft_batch <section|all>
+/admin_nft_batch_status
 
 🧠 **AI LAYER**
 /admin_ai_memory
 
 👥 **SUBSCRIPTIONS**
 /admin_subscribers
+/admin_add_subscriber <user_id> <tier> [monthly|yearly]
 /admin_notify <tier|all> <message>
+/admin_notify_status
 
 📊 **ECOSYSTEM OVERVIEW**
 /admin_ecosystem_stats
+/admin_perf
 
 ━━━━━━━━━━━━━━━━━━━━━━━━
 Du er kontrollanten. Det hele er synkroniseret.
 Better. Faster. Stronger.
-        """
-        await event.respond(menu)
+"""
+
+class AdminPanel:
+    def __init__(self, catalog, subscriptions, nft_layer, ai_engine, broadcaster=None, cache=None, perf=None):
+        self.catalog = catalog
+        self.subscriptions = subscriptions
+        self.nft = nft_layer
+        self.ai = ai_engine
+        self.broadcaster = broadcaster
+        self.batch_jobs = {}  # scope -> (NFTBatchJob, asyncio.Task)
+        self.cache = cache if cache is not None else ResponseCache()
+        self.perf = perf if perf is not None else CommandStats()
+        self._register_cached_responses()
+        
+        # command -> handler(event, parts); one dict lookup per admin command
+        self.commands = {
+            "/admin": lambda event, parts: self._admin_menu(event),
+            "/admin_add_section": self._add_section,
+            "/admin_add_product": self._add_product,
+            "/admin_update_product": self._update_product,
+            "/admin_delete_product": self._delete_product,
+            "/admin_view_menu": lambda event, parts: self._view_menu(event),
+            "/admin_nft_stats": lambda event, parts: self._nft_stats(event),
+            "/admin_nft_batch": self._nft_batch,
+            "/admin_nft_batch_status": lambda event, parts: self._nft_batch_status(event),
+            "/admin_ai_memory": lambda event, parts: self._ai_memory(event),
+            "/admin_ecosystem_stats": lambda event, parts: self._ecosystem_stats(event),
+            "/admin_perf": lambda event, parts: self._perf(event),
+            "/admin_subscribers": lambda event, parts: self._view_subscribers(event),
+            "/admin_add_subscriber": self._add_subscriber,
+            "/admin_notify": self._notify_subscribers,
+            "/admin_notify_status": lambda event, parts: self._notify_status(event),
+        }
+
+    def _register_cached_responses(self):
+        """Stats screens are rebuilt only after the layers they read from change ("menu_pages" is the bot's)"""
+        # "Generated Today" also changes at midnight (UTC), without any NFT op
+        self.cache.register("admin_nft_stats", self._nft_stats_text, tags=("nft",), bucket=lambda: utc_day(time.time()))
+        self.cache.register("admin_subscribers", self._subscribers_text, tags=("subscriptions",))
+        self.cache.register(
+            "admin_ecosystem_stats", self._ecosystem_stats_text,
+            tags=("catalog", "subscriptions", "nft", "ai")
+        )
+
+    def is_admin(self, user_id):
+        return user_id == ADMIN_ID
+
+    async def handle_admin_command(self, event, command_text):
+        if not self.is_admin(event.sender_id):
+            await event.respond("🔒 Admin only. Stay added to the channel.")
+            return
+
+        try:
+            parts = command_text.split()
+            if not parts:
+                return
+
+            action = parse_command(parts[0])[0]
+            handler = self.commands.get(action)
+
+            if handler:
+                await handler(event, parts)
+            else:
+                await event.respond("❓ Unknown command. /admin for menu")
+        except Exception as e:
+            self_heal(f"Admin command failed: {e}")
+            await event.respond("⚠️ Command error. Self-heal activated.")
+
+    async def _admin_menu(self, event):
+        await event.respond(ADMIN_MENU)
 
     async def _add_section(self, event, parts):
         try:
@@ -162,30 +190,98 @@ Better. Faster. Stronger.
 
     async def _view_menu(self, event):
         try:
-            menu = self.catalog.render_menu()
-            await event.respond(menu)
+            # Same pages as /menu when sharing the bot's cache
+            pages = self.cache.get("menu_pages") if "menu_pages" in self.cache else split_message(self.catalog.render_menu())
+            for page in pages:
+                await event.respond(page)
         except Exception as e:
             self_heal(f"View menu failed: {e}")
 
     async def _nft_stats(self, event):
         try:
-            stats = self.nft.get_nft_stats()
-            all_nfts = len(self.nft.list_all_nfts())
-            
-            msg = f"""
+            await event.respond(self.cache.get("admin_nft_stats"))
+        except Exception as e:
+            self_heal(f"NFT stats failed: {e}")
+
+    def _nft_stats_text(self):
+        stats = self.nft.get_nft_stats()
+        breakdown = self.nft.get_nft_breakdown()
+        sections = "\n".join(
+            f"   {section}: {count}"
+            for section, count in sorted(breakdown["by_section"].items(), key=lambda kv: -kv[1])
+        ) or "   -"
+        
+        msg = f"""
 🎨 **NFT ECOSYSTEM STATS**
 ━━━━━━━━━━━━━━━━━━━━━━━━
 
 Total NFTs Generated: {stats.get('total_nfts_generated', 0)}
+Generated Today: {stats.get('generated_today', 0)}
 NFTs with Ownership: {stats.get('nfts_with_ownership', 0)}
 Unique Owners: {stats.get('unique_owners', 0)}
 Unowned NFTs: {stats.get('unowned_nfts', 0)}
 
+📂 **Per Section**
+{sections}
+
 🎨 All systems active and tracking.
             """
+        return msg
+
+    async def _nft_batch(self, event, parts):
+        try:
+            if len(parts) < 2:
+                await event.respond("Usage: /admin_nft_batch <section|all>")
+                return
+            
+            section = None if parts[1] == "all" else parts[1]
+            if section and not self.catalog.get_section(section):
+                await event.respond(f"❌ Section '{section}' not found")
+                return
+            
+            scope = section or "all"
+            running = self.batch_jobs.get(scope)
+            if running and not running[1].done():
+                await event.respond(f"⏳ Batch already running: {scope}")
+                return
+            
+            job = NFTBatchJob(self.nft, self.catalog, section_title=section)
+            
+            async def progress(done, total):
+                await event.respond(f"🎨 Batch {scope}: {done}/{total}")
+            
+            async def run():
+                try:
+                    completed, failed = await job.run(progress=progress)
+                    elapsed = job.finished - job.started
+                    await event.respond(
+                        f"✅ Batch {scope} done: {completed} NFTs, {failed} failed ({elapsed:.1f}s)"
+                    )
+                except Exception as e:
+                    self_heal(f"NFT batch failed: {e}")
+                    await event.respond(f"⚠️ Batch {scope} stopped. Re-run to resume.")
+            
+            self.batch_jobs[scope] = (job, asyncio.create_task(run()))
+            await event.respond(f"⏳ Batch started: {scope}")
+        except Exception as e:
+            self_heal(f"NFT batch start failed: {e}")
+
+    async def _nft_batch_status(self, event):
+        try:
+            lines = []
+            for scope, (job, task) in self.batch_jobs.items():
+                state = "done" if task.done() else "running"
+                lines.append(f"{scope}: {state} · {job.completed}/{job.total} · {job.failed} failed")
+            for scope, rendered in NFTBatchJob.pending_checkpoints(self.nft.nft_dir).items():
+                running = self.batch_jobs.get(scope)
+                if not running or running[1].done():
+                    lines.append(f"{scope}: interrupted · {rendered} rendered · re-run to resume")
+            
+            msg = "🎨 **NFT BATCHES**\n━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+            msg += "\n".join(lines) if lines else "No batches"
             await event.respond(msg)
         except Exception as e:
-            self_heal(f"NFT stats failed: {e}")
+            self_heal(f"NFT batch status failed: {e}")
 
     async def _ai_memory(self, event):
         try:
@@ -210,14 +306,20 @@ Memory Status: Active & Tracking
 
     async def _ecosystem_stats(self, event):
         try:
-            sections = len(self.catalog.get_all_sections())
-            products = sum(len(s["products"]) for s in self.catalog.get_all_sections())
-            subs = self.subscriptions.get_subscriber_count()
-            breakdown = self.subscriptions.get_tier_breakdown()
-            nft_stats = self.nft.get_nft_stats()
-            ai_memory = self.ai.get_memory_summary()
-            
-            msg = f"""
+            await event.respond(self.cache.get("admin_ecosystem_stats"))
+        except Exception as e:
+            self_heal(f"Ecosystem stats failed: {e}")
+
+    def _ecosystem_stats_text(self):
+        sections = len(self.catalog.get_all_sections())
+        products = sum(len(s["products"]) for s in self.catalog.get_all_sections())
+        subs = self.subscriptions.get_subscriber_count()
+        breakdown = self.subscriptions.get_tier_breakdown()
+        tiers = "\n".join(f"   {self.subscriptions.tier_title(tier)}: {count}" for tier, count in breakdown.items())
+        nft_stats = self.nft.get_nft_stats()
+        ai_memory = self.ai.get_memory_summary()
+        
+        msg = f"""
 📊 **COMPLETE ECOSYSTEM STATUS**
 ━━━━━━━━━━━━━━━━━━━━━━━━
 
@@ -228,8 +330,7 @@ Memory Status: Active & Tracking
 
 👥 **SUBSCRIPTION LAYER**
    Total Active: {subs}
-   Standard: {breakdown['standard']}
-   Advanced: {breakdown['advanced']}
+{tiers}
    Status: Live
 
 🎨 **NFT LAYER**
@@ -251,29 +352,81 @@ Memory Status: Active & Tracking
 ━━━━━━━━━━━━━━━━━━━━━━━━
 Better. Faster. Stronger. No fantasy coding.
             """
+        return msg
+
+    async def _perf(self, event):
+        try:
+            def ms(histogram, q):
+                return f"{histogram.quantile(q) * 1000:.0f}"
+            
+            commands = "\n".join(
+                f"{command} · {h.count} · {ms(h, 0.5)}/{ms(h, 0.95)}/{ms(h, 0.99)} ms · "
+                f"{self.perf.errors[command]} err · {self.perf.in_flight[command]} live"
+                for command, h in sorted(self.perf.latency.items(), key=lambda kv: -kv[1].count)
+            ) or "-"
+            stages = "\n".join(
+                f"{job}/{stage} · {h.count} · {ms(h, 0.5)}/{ms(h, 0.95)}/{ms(h, 0.99)} ms"
+                for (job, stage), h in sorted(self.perf.stages.items())
+            ) or "-"
+            
+            msg = f"""
+⚡ **PERFORMANCE** (count · p50/p95/p99)
+━━━━━━━━━━━━━━━━━━━━━━━━
+
+📨 **Commands**
+{commands}
+
+⚙️ **Job stages**
+{stages}
+            """
             await event.respond(msg)
         except Exception as e:
-            self_heal(f"Ecosystem stats failed: {e}")
+            self_heal(f"Perf stats failed: {e}")
 
     async def _view_subscribers(self, event):
         try:
-            users = self.subscriptions.notify_premium_users()
-            breakdown = self.subscriptions.get_tier_breakdown()
-            
-            msg = f"""
+            await event.respond(self.cache.get("admin_subscribers"))
+        except Exception as e:
+            self_heal(f"View subscribers failed: {e}")
+
+    def _subscribers_text(self):
+        total = self.subscriptions.get_subscriber_count()
+        breakdown = self.subscriptions.get_tier_breakdown()
+        tiers = "\n".join(
+            f"{self.subscriptions.tiers.get(tier, {}).get('emoji', '•')} {self.subscriptions.tier_title(tier)}: {count}"
+            for tier, count in breakdown.items()
+        ) or "No tiers configured"
+        
+        msg = f"""
 👥 **SUBSCRIBERS**
 ━━━━━━━━━━━━━━━━━━━━━━━━
 
-Total Active: {len(users)}
+Total Active: {total}
 
-🌟 Premium Standard: {breakdown['standard']}
-⭐ Premium Advanced: {breakdown['advanced']}
+{tiers}
 
 Status: All systems synced
             """
-            await event.respond(msg)
+        return msg
+
+    async def _add_subscriber(self, event, parts):
+        try:
+            if len(parts) < 3 or not parts[1].isdigit():
+                await event.respond(
+                    f"Usage: /admin_add_subscriber <user_id> <{'|'.join(self.subscriptions.tiers)}> [monthly|yearly]"
+                )
+                return
+            
+            user_id = int(parts[1])
+            tier = parts[2].lower()
+            period = parts[3].lower() if len(parts) > 3 else "monthly"
+            
+            if self.subscriptions.subscribe_user(user_id, tier, period):
+                await event.respond(f"✅ Subscriber added: {user_id} ({tier}, {period})")
+            else:
+                await event.respond("❌ Unknown tier or period")
         except Exception as e:
-            self_heal(f"View subscribers failed: {e}")
+            self_heal(f"Add subscriber failed: {e}")
 
     async def _notify_subscribers(self, event, parts):
         try:
@@ -284,14 +437,29 @@ Status: All systems synced
             tier_filter = parts[1] if parts[1] != "all" else None
             message = " ".join(parts[2:])
             
-            users = self.subscriptions.notify_premium_users(tier_filter)
+            if tier_filter:
+                recipients = self.subscriptions.get_tier_breakdown().get(tier_filter, 0)
+            else:
+                recipients = self.subscriptions.get_subscriber_count()
             
-            if not users:
+            if not recipients:
                 await event.respond("❌ No subscribers found")
                 return
             
-            await event.respond(f"📢 Sending to {len(users)} subscribers...")
-            await asyncio.sleep(0.5)
-            await event.respond(f"✅ Message queued")
+            job = self.broadcaster.start(tier_filter, message)
+            await event.respond(f"📢 Sending to {recipients} subscribers... (job {job.job_id})")
         except Exception as e:
             self_heal(f"Notify failed: {e}")
+
+    async def _notify_status(self, event):
+        try:
+            lines = [
+                f"{job.job_id} · {job.tier or 'all'} · {'running' if job.running else 'done'} · "
+                f"{job.delivered}/{job.total} delivered · {job.failed} failed"
+                for job in self.broadcaster.jobs.values()
+            ]
+            msg = "📢 **BROADCASTS**\n━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+            msg += "\n".join(lines) if lines else "No broadcasts"
+            await event.respond(msg)
+        except Exception as e:
+            self_heal(f"Notify status failed: {e}")
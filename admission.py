@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+ECOSYSTEM ADMISSION CONTROL: Bounded job queues with per-user limits
+The global depth limit follows measured service time: accept only what can finish within the target wait.
+"""
+
+import os
+from collections import Counter
+
+SERVICE_TIME_ALPHA = 0.2   # EWMA weight of the newest job
+
+class AdmissionController:
+    ADMITTED = "admitted"
+    USER_LIMIT = "user_limit"
+    BUSY = "busy"
+
+    def __init__(self, name, per_user=1, target_wait=30.0, workers=1,
+                 min_depth=2, max_depth=100, initial_service_time=5.0):
+        self.name = name
+        self.per_user = per_user          # jobs one user may have queued or running
+        self.target_wait = target_wait    # seconds a newly admitted job may wait + run
+        self.workers = workers
+        self.min_depth = min_depth
+        self.max_depth = max_depth
+        self.service_time = initial_service_time  # EWMA seconds per job
+        self.in_flight = Counter()        # user_id -> queued + running jobs
+        self.depth = 0
+        self.admitted = 0
+        self.completed = 0
+        self.busy_seconds = 0.0           # summed service time; rate() / workers = utilisation
+        self.rejected = Counter()         # reason -> count
+
+    @classmethod
+    def from_env(cls, name, **defaults):
+        """Build with NAME_ADMISSION_* env overrides, e.g. AI_ADMISSION_PER_USER"""
+        prefix = f"{name.upper()}_ADMISSION_"
+        config = dict(defaults)
+        for key, cast in (("per_user", int), ("target_wait", float), ("min_depth", int),
+                          ("max_depth", int), ("initial_service_time", float)):
+            value = os.getenv(prefix + key.upper())
+            if value is not None:
+                config[key] = cast(value)
+        return cls(name, **config)
+
+    @property
+    def depth_limit(self):
+        capacity = self.target_wait * self.workers / max(self.service_time, 1e-3)
+        return max(self.min_depth, min(self.max_depth, int(capacity)))
+
+    def estimated_wait(self):
+        return self.depth * self.service_time / self.workers
+
+    def try_admit(self, user_id):
+        """Reserve a slot for the user's job; returns ADMITTED or the rejection reason"""
+        if self.in_flight[user_id] >= self.per_user:
+            self.rejected[self.USER_LIMIT] += 1
+            return self.USER_LIMIT
+        if self.depth >= self.depth_limit:
+            self.rejected[self.BUSY] += 1
+            return self.BUSY
+        self.in_flight[user_id] += 1
+        self.depth += 1
+        self.admitted += 1
+        return self.ADMITTED
+
+    def release(self, user_id, service_time=None):
+        """Free the user's slot when the job finishes (or is abandoned before running)"""
+        if self.in_flight[user_id] <= 1:
+            self.in_flight.pop(user_id, None)
+        else:
+            self.in_flight[user_id] -= 1
+        self.depth = max(0, self.depth - 1)
+        if service_time is not None:
+            self.completed += 1
+            self.busy_seconds += service_time
+            self.service_time += SERVICE_TIME_ALPHA * (service_time - self.service_time)
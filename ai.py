@@ -1,5 +1,6 @@
 import asyncio, json
 from self_heal import self_heal
+from retry import retry_async
 
 class HybridAI:
     def __init__(self, memory_limit=20):
@@ -9,15 +10,14 @@ class HybridAI:
 
     async def generate(self, prompt):
         context = "\n".join(self.memory[-self.memory_limit:])
-        try:
-            response = await self.call_mistral(prompt, context)
-            self.memory.append(f"User: {prompt}")
-            self.memory.append(f"AI: {response}")
-            self._record_milestone(prompt, response)
-            return response
-        except Exception as e:
-            self_heal(f"HybridAI generate error: {e}")
+        result = await retry_async(self.call_mistral, prompt, context, label="HybridAI call")
+        if not result.ok:
+            self_heal(f"HybridAI generate error: {result.error}")
             return f"(Fallback AI svar: {prompt})"
+        self.memory.append(f"User: {prompt}")
+        self.memory.append(f"AI: {result.value}")
+        self._record_milestone(prompt, result.value)
+        return result.value
 
     async def call_mistral(self, prompt, context):
         await asyncio.sleep(0.1)  # placeholder
@@ -1,223 +1,123 @@
 #!/usr/bin/env python3
 """
-ECOSYSTEM CORE: Catalog Management
-Integrates with AI, NFT, self-heal, subscriptions, and heartbeat
+ECOSYSTEM AI LAYER: Mistral + Memory + Context
+Backend calls go through the shared retry policy; failures degrade to a fallback answer.
 """
 
-import json, os, asyncio
+import json, os
+from collections import deque
 from self_heal import self_heal
-
-class CatalogManager:
-    def __init__(self, catalog_file="catalog.json", ai_engine=None):
-        self.catalog_file = catalog_file
-        self.ai_engine = ai_engine  # HybridAI instance for AI-powered descriptions
-        self.catalog = self._load_catalog()
-
-    def _load_catalog(self):
-        try:
-            if os.path.exists(self.catalog_file):
-                with open(self.catalog_file, "r") as f:
-                    return json.load(f)
-            return {
-                "brand": "🌒   N T R L I '   S E L E C T I O N",
-                "tagline": "Det her er ikke bare noget du tilvælger, det er noget du genkender.",
-                "sections": [],
-                "premium_tiers": [],
-                "info": {},
-                "ai_insights": [],  # Track AI-generated product insights
-                "nft_catalog": []   # Track NFT-ified products
-            }
-        except Exception as e:
-            self_heal(f"Catalog load failed: {e}")
-            return {"sections": [], "premium_tiers": [], "ai_insights": [], "nft_catalog": []}
-
-    def _save_catalog(self):
-        try:
-            with open(self.catalog_file, "w") as f:
-                json.dump(self.catalog, f, indent=2, ensure_ascii=False)
-            return True
-        except Exception as e:
-            self_heal(f"Catalog save failed: {e}")
-            return False
-
-    async def generate_product_insight(self, product_name, specs):
-        """Use AI to generate intelligent product descriptions"""
-        try:
-            if not self.ai_engine:
-                return None
-            
-            prompt = f"Generate a compelling, brief product insight for: {product_name} ({specs}). Keep it 1-2 sentences, professional."
-            insight = await self.ai_engine.generate(prompt)
-            
-            self.catalog["ai_insights"].append({
-                "product": product_name,
-                "insight": insight,
-                "timestamp": str(os.times())
-            })
-            self._save_catalog()
-            return insight
-        except Exception as e:
-            self_heal(f"Generate product insight failed: {e}")
-            return None
-
-    def add_section(self, title, emoji, description=""):
-        try:
-            section = {
-                "title": title,
-                "emoji": emoji,
-                "description": description,
-                "products": []
-            }
-            self.catalog["sections"].append(section)
-            self._save_catalog()
-            return True
-        except Exception as e:
-            self_heal(f"Add section failed: {e}")
-            return False
-
-    def add_product_to_section(self, section_title, name, specs, price, notes=""):
+from retry import retry_async, RetryPolicy
+from mistral import MistralClient
+
+AI_RETRY = RetryPolicy(attempts=3, base_delay=0.5, max_delay=5.0)
+AI_SYSTEM_PROMPT = os.getenv(
+    "AI_SYSTEM_PROMPT", "Du er NTRLI' assistenten. Svar kort, venligt og på brugerens sprog."
+)
+MILESTONES_KEPT = int(os.getenv("MILESTONES_KEPT", 1000))   # newest milestones held in memory
+
+class EcosystemAI:
+    def __init__(self, memory_limit=20, milestones_file="milestones.json", autoload=True, backend=None):
+        self.memory_limit = memory_limit
+        self.memory = deque(maxlen=memory_limit)   # circular: last N exchanges
+        self.milestones_file = milestones_file
+        self.milestones = self._load_milestones() if autoload else deque(maxlen=MILESTONES_KEPT)
+        self.backend = backend or MistralClient()
+
+    def load(self):
+        """Read the milestones file"""
+        self.milestones = self._load_milestones()
+        return self
+
+    def set_memory_limit(self, memory_limit):
+        """Resize the exchange window without a restart; the newest exchanges are kept"""
+        if memory_limit < 1:
+            raise ValueError(f"memory_limit must be positive, got {memory_limit}")
+        self.memory = deque(self.memory, maxlen=memory_limit)
+        self.memory_limit = memory_limit
+
+    def _load_milestones(self):
+        """Milestones file: JSON lines (legacy: one JSON list); only the newest MILESTONES_KEPT stay in memory"""
+        milestones = deque(maxlen=MILESTONES_KEPT)
         try:
-            for section in self.catalog["sections"]:
-                if section["title"] == section_title:
-                    product = {
-                        "name": name,
-                        "specs": specs,
-                        "price": price,
-                        "notes": notes,
-                        "status": "available",
-                        "nft_id": None,  # Will be set when NFT is created
-                        "ai_generated": False
-                    }
-                    section["products"].append(product)
-                    self._save_catalog()
-                    return True
-            return False
+            if not os.path.exists(self.milestones_file):
+                return milestones
+            with open(self.milestones_file, "r") as f:
+                content = f.read().strip()
+            if not content:
+                return milestones
+            if content.startswith("["):
+                # Migrate once so later appends stay valid JSON lines
+                legacy = json.loads(content)
+                with open(self.milestones_file, "w") as f:
+                    f.writelines(json.dumps(m, ensure_ascii=False) + "\n" for m in legacy)
+                milestones.extend(legacy)
+                return milestones
+            for line in content.splitlines():
+                try:
+                    milestones.append(json.loads(line))
+                except ValueError:
+                    break  # torn tail line
+            return milestones
         except Exception as e:
-            self_heal(f"Add product failed: {e}")
-            return False
-
-    def register_product_nft(self, section_title, product_name, nft_file):
-        """Register NFT conversion for a product"""
-        try:
-            for section in self.catalog["sections"]:
-                if section["title"] == section_title:
-                    for product in section["products"]:
-                        if product["name"] == product_name:
-                            product["nft_id"] = nft_file
-                            self.catalog["nft_catalog"].append({
-                                "product": product_name,
-                                "nft_file": nft_file,
-                                "section": section_title
-                            })
-                            self._save_catalog()
-                            return True
-            return False
-        except Exception as e:
-            self_heal(f"Register NFT failed: {e}")
-            return False
-
-    def update_product(self, section_title, product_name, **kwargs):
+            self_heal(f"Milestones load failed: {e}")
+            return milestones
+
+    def _context(self, user_id):
+        """Earlier exchanges with this user as chat messages, oldest first"""
+        messages = []
+        for exchange in self.memory:
+            if user_id is None or exchange["user_id"] == user_id:
+                messages.append({"role": "user", "content": exchange["prompt"]})
+                messages.append({"role": "assistant", "content": exchange["response"]})
+        return messages
+
+    async def generate(self, prompt, context_user_id=None):
+        """Answer a prompt; falls back to a canned reply when the backend stays down"""
+        result = await self.generate_result(prompt, context_user_id)
+        if result.ok:
+            return result.value
+        return f"(Fallback AI svar: {prompt})"
+
+    async def generate_result(self, prompt, context_user_id=None):
+        """Typed variant of generate(): a RetryResult carrying the response or the last error"""
+        result = await retry_async(
+            self.call_mistral, prompt, self._context(context_user_id),
+            policy=AI_RETRY, label="Mistral call"
+        )
+        if result.ok:
+            # Exchanges live only in the bounded in-memory window; nothing per /ask is written to disk
+            self.memory.append({"user_id": context_user_id, "prompt": prompt, "response": result.value})
+        elif result.gave_up == "permanent":
+            self_heal(f"EcosystemAI generate error: {result.error}")
+        return result
+
+    async def call_mistral(self, prompt, context):
+        """context: earlier exchanges as chat messages (see _context)"""
+        if not self.backend.configured:
+            return f"[AI Response] {prompt}"  # no backend configured
+        messages = [{"role": "system", "content": AI_SYSTEM_PROMPT}, *context, {"role": "user", "content": prompt}]
+        return await self.backend.chat(messages)
+
+    def record_milestone(self, kind, data):
+        """Rare ecosystem events for analytics (not chat traffic); one small append each"""
+        milestone = {"type": kind, **data}
+        self.milestones.append(milestone)
         try:
-            for section in self.catalog["sections"]:
-                if section["title"] == section_title:
-                    for product in section["products"]:
-                        if product["name"] == product_name:
-                            for key, value in kwargs.items():
-                                if key in product:
-                                    product[key] = value
-                            self._save_catalog()
-                            return True
-            return False
+            with open(self.milestones_file, "a") as f:
+                f.write(json.dumps(milestone, ensure_ascii=False) + "\n")
         except Exception as e:
-            self_heal(f"Update product failed: {e}")
-            return False
+            self_heal(f"Milestone record failed: {e}")
 
-    def delete_product(self, section_title, product_name):
-        try:
-            for section in self.catalog["sections"]:
-                if section["title"] == section_title:
-                    section["products"] = [p for p in section["products"] if p["name"] != product_name]
-                    self._save_catalog()
-                    return True
-            return False
-        except Exception as e:
-            self_heal(f"Delete product failed: {e}")
-            return False
-
-    def get_section(self, title):
-        for section in self.catalog["sections"]:
-            if section["title"] == title:
-                return section
-        return None
-
-    def get_all_sections(self):
-        return self.catalog["sections"]
-
-    def get_product_by_nft(self, nft_id):
-        """Retrieve product associated with NFT"""
-        for section in self.catalog["sections"]:
-            for product in section["products"]:
-                if product.get("nft_id") == nft_id:
-                    return product, section["title"]
-        return None, None
-
-    def set_brand_info(self, key, value):
-        try:
-            self.catalog[key] = value
-            self._save_catalog()
-            return True
-        except Exception as e:
-            self_heal(f"Set brand info failed: {e}")
-            return False
-
-    def set_opening_hours(self, hours):
-        try:
-            self.catalog["info"]["opening_hours"] = hours
-            self._save_catalog()
-            return True
-        except Exception as e:
-            self_heal(f"Set hours failed: {e}")
-            return False
-
-    def set_delivery_info(self, delivery_text):
-        try:
-            self.catalog["info"]["delivery"] = delivery_text
-            self._save_catalog()
-            return True
-        except Exception as e:
-            self_heal(f"Set delivery failed: {e}")
-            return False
-
-    def render_menu(self):
-        """Generate formatted menu with exact aesthetic"""
-        try:
-            menu = f"{self.catalog['brand']}\n"
-            menu += "━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-            
-            for section in self.catalog["sections"]:
-                menu += f"{section['emoji']}  {section['title']}\n"
-                menu += "━━━━━━━━━━━━━━━━━━━━━━━━\n"
-                if section["description"]:
-                    menu += f"{section['description']}\n\n"
-                
-                for product in section["products"]:
-                    menu += f"**{product['name']}**\n"
-                    menu += f"{product['specs']}\n"
-                    menu += f"💵 {product['price']}\n"
-                    if product['notes']:
-                        menu += f"{product['notes']}\n"
-                    menu += "\n"
-            
-            menu += "━━━━━━━━━━━━━━━━━━━━━━━━\n"
-            menu += f"\n\"{self.catalog['tagline']}\"\n"
-            
-            return menu
-        except Exception as e:
-            self_heal(f"Render menu failed: {e}")
-            return "Menu unavailable"
+    def get_memory_summary(self):
+        return {
+            "conversation_length": len(self.memory),
+            "recent_exchanges": list(self.memory)[-5:],
+            "memory_limit": self.memory_limit
+        }
 
-    def get_ai_insights(self):
-        return self.catalog["ai_insights"]
+    def get_milestones(self):
+        return self.milestones
 
-    def get_nft_catalog(self):
-        return self.catalog["nft_catalog"]
+    def reset_memory(self):
+        self.memory.clear()
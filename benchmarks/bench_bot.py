@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK: Offline load test of the real bot_updated handlers - no Telegram account needed
+Run: python benchmarks/bench_bot.py [--rate 50] [--duration 20] [--mix menu=50,ask=20,nft=5,admin=25]
+Fake events enter through the bot's router; replies go through the real outbound dispatcher
+into a fake chat with configurable send latency, and /ask hits a stub AI backend.
+Exits non-zero when a --p95-budget is exceeded.
+"""
+
+import argparse, asyncio, io, json, os, random, resource, sys, tempfile, time, tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Import-time config for bot_updated: fake credentials, and Telegram's send limits lifted unless asked for
+os.environ.setdefault("API_ID", "1")
+os.environ.setdefault("API_HASH", "bench")
+os.environ.setdefault("BOT_TOKEN", "bench")
+
+ADMIN_COMMANDS = (
+    "/admin_view_menu", "/admin_nft_stats", "/admin_ecosystem_stats", "/admin_subscribers", "/admin_perf",
+    "/admin_update_product",
+)
+COMMAND_LABELS = {"menu": "/menu", "ask": "/ask", "nft": "/nft", "admin": "/admin_*", "start": "/start", "premium": "/premium"}
+
+def parse_pairs(text, cast=float):
+    pairs = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        key, value = item.split("=")
+        pairs[key.strip()] = cast(value)
+    return pairs
+
+def percentile(samples, q):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+class FakeMessage:
+    """What respond() returns; no media, so the file ref cache never gets a reference"""
+    media = None
+
+class FakeFile:
+    def __init__(self, size):
+        self.size = size
+
+class FakeReply:
+    """A message with a photo, as returned by event.get_reply_message()"""
+
+    def __init__(self, image_bytes):
+        self.media = True
+        self.file = FakeFile(len(image_bytes))
+        self._bytes = image_bytes
+
+    async def download_media(self, file, progress_callback=None):
+        file.write(self._bytes)
+        if progress_callback:
+            progress_callback(len(self._bytes), len(self._bytes))
+        return file
+
+class Request:
+    __slots__ = ("kind", "text", "sent", "handled", "replies")
+
+    def __init__(self, kind, text):
+        self.kind = kind
+        self.text = text
+        self.sent = time.perf_counter()
+        self.handled = None
+        self.replies = []   # (perf_counter, text)
+
+class FakeEvent:
+    """The subset of a Telethon NewMessage event the handlers use"""
+
+    def __init__(self, request, sender_id, reply, send_latency):
+        self.request = request
+        self.sender_id = sender_id
+        self.chat_id = sender_id
+        self.raw_text = request.text
+        self.message = self
+        self._reply = reply
+        self._send_latency = send_latency
+
+    async def respond(self, message=None, **kwargs):
+        await asyncio.sleep(self._send_latency)
+        return FakeMessage()
+
+    async def get_reply_message(self):
+        return self._reply
+
+def make_image(width, height):
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.radial_gradient("L").resize((width, height)).convert("RGB").save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+async def seed_catalog(bot, sections, products):
+    with bot.catalog.batch_updates():
+        for s in range(sections):
+            bot.catalog.add_section(f"S{s}", "🌿", f"Section {s}")
+            for p in range(products):
+                bot.catalog.add_product_to_section(f"S{s}", f"P{s}-{p}", "3.5g·indica", f"{100 + p} kr", "notes")
+
+def next_request(kind, args, rng):
+    if kind == "menu":
+        return "/menu"
+    if kind == "ask":
+        return f"/ask hvad anbefaler du til en rolig aften {rng.randrange(1000)}"
+    if kind == "nft":
+        return "/nft"
+    if kind == "admin":
+        command = rng.choice(ADMIN_COMMANDS)
+        if command == "/admin_update_product":
+            s, p = rng.randrange(args.sections), rng.randrange(args.products)
+            return f"/admin_update_product S{s} P{s}-{p} price {rng.randrange(100, 400)} kr"
+        return command
+    return f"/{kind}"
+
+async def drive(bot, args):
+    from admin_panel import ADMIN_ID
+
+    async def stub_backend(prompt, context):
+        await asyncio.sleep(max(0.0, rng.gauss(args.ai_latency, args.ai_latency * 0.2)))
+        return f"[stub] {prompt[:40]}"
+
+    def recorded_respond(event, message=None, *args, **kwargs):
+        # Replies are timed when the dispatcher delivers them: a merged send resolves every merged future
+        future = dispatcher_respond(event, message, *args, **kwargs)
+        def delivered(future):
+            if not future.cancelled() and future.exception() is None:
+                event.request.replies.append((time.perf_counter(), "<file>" if "file" in kwargs else message))
+        future.add_done_callback(delivered)
+        return future
+
+    rng = random.Random(args.seed)
+    bot.ai_engine.call_mistral = stub_backend
+    dispatcher_respond = bot.outbound.respond
+    bot.outbound.respond = recorded_respond
+    await bot.load_layers()
+    await seed_catalog(bot, args.sections, args.products)
+    bot.BOT_IS_ACTIVE = True
+    tasks = [
+        asyncio.create_task(bot.outbound.run()),
+        asyncio.create_task(bot.ai_worker()),
+        asyncio.create_task(bot.nft_worker()),
+        asyncio.create_task(bot.loop_monitor.run()),
+    ]
+    reply = FakeReply(make_image(args.image_width, args.image_height))
+    kinds, weights = zip(*args.mix.items())
+    requests, handlers = [], []
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+    next_at = started
+    while next_at < deadline:
+        await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+        kind = rng.choices(kinds, weights)[0]
+        request = Request(kind, next_request(kind, args, rng))
+        sender = ADMIN_ID if kind == "admin" else rng.randrange(1, args.users + 1)
+        event = FakeEvent(request, sender, reply if kind == "nft" else None, args.send_latency)
+        handler = asyncio.create_task(bot.router.dispatch(event))
+        handler.add_done_callback(lambda _, request=request: setattr(request, "handled", time.perf_counter()))
+        requests.append(request)
+        handlers.append(handler)
+        next_at += rng.expovariate(args.rate)   # open loop: arrivals do not wait for replies
+    injected = time.perf_counter()
+
+    # Drain: handlers, queued jobs, then the outbound dispatcher
+    drain_until = time.perf_counter() + args.drain_timeout
+    await asyncio.wait(handlers, timeout=args.drain_timeout)
+    await asyncio.wait_for(asyncio.gather(bot.mistral_queue.join(), bot.nft_queue.join()),
+                           timeout=max(0.1, drain_until - time.perf_counter()))
+    while bot.outbound.pending() and time.perf_counter() < drain_until:
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(args.send_latency * 2 + 0.05)   # sends already taken off the queue
+    finished = max((r.replies[-1][0] for r in requests if r.replies), default=time.perf_counter())
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return requests, started, injected, finished
+
+def summarise(bot, requests, started, injected, finished):
+    rejected_texts = (bot.BUSY_TEXT, bot.USER_LIMIT_TEXT)
+    results = {}
+    for kind in sorted({r.kind for r in requests}):
+        batch = [r for r in requests if r.kind == kind]
+        answered = [r for r in batch if r.replies]
+        rejected = [r for r in answered if any(text in rejected_texts for _, text in r.replies)]
+        served = [r for r in answered if r not in rejected]
+        results[COMMAND_LABELS.get(kind, kind)] = {
+            "sent": len(batch),
+            "served": len(served),
+            "rejected": len(rejected),
+            "unanswered": len(batch) - len(answered),
+            "handler_ms": [percentile([(r.handled - r.sent) * 1000 for r in batch if r.handled], q)
+                           for q in (0.5, 0.95, 0.99)],
+            "first_reply_ms": [percentile([(r.replies[0][0] - r.sent) * 1000 for r in served], q)
+                               for q in (0.5, 0.95, 0.99)],
+            "final_reply_ms": [percentile([(r.replies[-1][0] - r.sent) * 1000 for r in served], q)
+                               for q in (0.5, 0.95, 0.99)],
+        }
+    return {
+        "offered_rate": len(requests) / max(injected - started, 1e-9),
+        "throughput": sum(c["served"] for c in results.values()) / max(finished - started, 1e-9),
+        "wall_seconds": finished - started,
+        "max_loop_lag_ms": bot.loop_monitor.max_lag * 1000,
+        "slow_callbacks": bot.loop_monitor.slow_callbacks,
+        "commands": results,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rate", type=float, default=50, help="messages per second (Poisson arrivals)")
+    parser.add_argument("--duration", type=float, default=20, help="seconds of load")
+    parser.add_argument("--mix", default="menu=50,ask=20,nft=5,admin=25", help="command weights")
+    parser.add_argument("--users", type=int, default=500, help="distinct non-admin senders")
+    parser.add_argument("--ai-latency", type=float, default=0.5, help="stub AI backend mean seconds")
+    parser.add_argument("--send-latency", type=float, default=0.02, help="fake Telegram send seconds")
+    parser.add_argument("--sections", type=int, default=5)
+    parser.add_argument("--products", type=int, default=12, help="products per section")
+    parser.add_argument("--image-width", type=int, default=1280)
+    parser.add_argument("--image-height", type=int, default=960)
+    parser.add_argument("--telegram-limits", action="store_true", help="keep production outbound rate limits")
+    parser.add_argument("--tracemalloc", action="store_true", help="also trace Python allocations (slower)")
+    parser.add_argument("--drain-timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--p95-budget", default="", help="e.g. /menu=50,/admin_*=200 (final reply ms)")
+    args = parser.parse_args()
+    args.mix = parse_pairs(args.mix)
+    budgets = parse_pairs(args.p95_budget)
+    cwd = os.getcwd()
+    if args.json:
+        args.json = os.path.abspath(args.json)
+
+    if not args.telegram_limits:
+        os.environ.setdefault("OUTBOUND_GLOBAL_RATE", "100000")
+        os.environ.setdefault("OUTBOUND_PER_CHAT_RATE", "100000")
+        os.environ.setdefault("OUTBOUND_PER_CHAT_BURST", "100000")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)   # session file, catalog, registry and journals stay in the temp dir
+        if args.tracemalloc:
+            tracemalloc.start()
+        rss_start = rss_mb()
+        import bot_updated as bot
+        requests, started, injected, finished = asyncio.run(drive(bot, args))
+        summary = summarise(bot, requests, started, injected, finished)
+        summary["memory_mb"] = {
+            "rss_start": rss_start,
+            "rss_end": rss_mb(),
+            "rss_peak": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        }
+        if args.tracemalloc:
+            summary["memory_mb"]["traced_peak"] = tracemalloc.get_traced_memory()[1] / 2**20
+        os.chdir(cwd)
+
+    print(f"offered:    {summary['offered_rate']:.1f} msg/s for {args.duration:.0f}s, mix {args.mix}")
+    print(f"throughput: {summary['throughput']:.1f} served/s ({summary['wall_seconds']:.1f}s incl. drain)")
+    print(f"event loop: max lag {summary['max_loop_lag_ms']:.1f} ms, {summary['slow_callbacks']} slow callbacks")
+    print("memory:     " + ", ".join(f"{k} {v:.1f} MB" for k, v in summary["memory_mb"].items()))
+    print(f"{'command':<10}{'sent':>6}{'served':>8}{'rej':>6}{'lost':>6}   handler p50/p95/p99   final reply p50/p95/p99 ms")
+    for command, c in summary["commands"].items():
+        handler = "/".join(f"{v:.1f}" for v in c["handler_ms"])
+        final = "/".join(f"{v:.0f}" for v in c["final_reply_ms"])
+        print(f"{command:<10}{c['sent']:>6}{c['served']:>8}{c['rejected']:>6}{c['unanswered']:>6}   {handler:<22}{final}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+    failed = False
+    for command, budget in budgets.items():
+        measured = summary["commands"].get(command, {}).get("final_reply_ms", [0, 0, 0])[1]
+        if measured > budget:
+            print(f"FAIL: {command} p95 {measured:.0f} ms > budget {budget:.0f} ms")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK: Product NFT card rendering - legacy redraw vs pre-rendered template
+Run: python benchmarks/bench_nft_templates.py [iterations]
+"""
+
+import os, sys, tempfile, time
+from PIL import Image, ImageDraw, ImageFont
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nft_templates import render_product_card, stamp_metadata
+
+SECTIONS = ["Premium Selection", "Micro Batches", "Classics"]
+
+def legacy_card(workdir, i, product_name, section_name, product_specs):
+    """The pre-template pipeline: redraw everything, PNG round-trip through a temp file"""
+    img = Image.new("RGB", (400, 300), color=(20, 20, 20))
+    draw = ImageDraw.Draw(img)
+    draw.text((20, 20), f"NTRLI' {section_name}", fill=(255, 200, 0))
+    draw.text((20, 60), product_name, fill=(255, 255, 255))
+    draw.text((20, 100), product_specs, fill=(200, 200, 200))
+    draw.text((20, 150), "Verified Product", fill=(0, 255, 100))
+    temp_path = f"{workdir}/temp_product.png"
+    img.save(temp_path)
+
+    img = Image.open(temp_path).convert("RGB")
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default()
+    draw.text((10, 10), f"NFT:{i:08x}\nProduct:{product_name}", fill=(255, 255, 255), font=font)
+    img.save(f"{workdir}/{i}_legacy.png")
+    os.remove(temp_path)
+
+def template_card(workdir, i, product_name, section_name, product_specs):
+    img = render_product_card(product_name, section_name, product_specs)
+    stamp_metadata(img, f"NFT:{i:08x}\nProduct:{product_name}")
+    img.save(f"{workdir}/{i}_template.png")
+
+def run(render, iterations):
+    with tempfile.TemporaryDirectory() as workdir:
+        render(workdir, -1, "Warmup", SECTIONS[0], "warmup")
+        start = time.perf_counter()
+        for i in range(iterations):
+            render(workdir, i, f"Product {i % 50}", SECTIONS[i % len(SECTIONS)], "3.5g · indica")
+        return (time.perf_counter() - start) / iterations
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    legacy = run(legacy_card, iterations)
+    template = run(template_card, iterations)
+    print(f"cards/run:         {iterations}")
+    print(f"legacy per card:   {legacy * 1000:.3f} ms")
+    print(f"template per card: {template * 1000:.3f} ms")
+    print(f"speedup:           {legacy / template:.2f}x")
+
+if __name__ == "__main__":
+    main()
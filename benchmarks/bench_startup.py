@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK: Bot startup - import cost of bot_updated and layer data loading
+Run: python benchmarks/bench_startup.py [records]
+Exits non-zero when importing bot_updated exceeds STARTUP_IMPORT_BUDGET_MS
+or pulls in a module that should only load on first use.
+"""
+
+import asyncio, json, os, subprocess, sys, tempfile, time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from catalog import CatalogManager
+from subscriptions import SubscriptionManager, Subscription
+from nft_ecosystem import NFTEcosystem
+from file_ref_cache import FileRefCache
+from ai_ecosystem import EcosystemAI
+
+IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", 400))
+CONNECT_MS = float(os.getenv("STARTUP_CONNECT_MS", 300))   # simulated Telegram handshake
+DEFERRED_MODULES = ("PIL.ImageDraw", "PIL.ImageFont", "httpx")   # first use only
+IMPORT_RUNS = 5
+
+PROBE = (
+    "import sys, time\n"
+    "started = time.perf_counter()\n"
+    "import bot_updated\n"
+    "print((time.perf_counter() - started) * 1000)\n"
+    f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))\n"
+)
+
+def run_probe(workdir, *flags):
+    env = dict(os.environ, API_ID="1", API_HASH="bench", BOT_TOKEN="bench", PYTHONPATH=ROOT)
+    return subprocess.run(
+        [sys.executable, *flags, "-c", PROBE], cwd=workdir, env=env, capture_output=True, text=True, check=True
+    )
+
+def import_profile():
+    """Fresh-interpreter import of bot_updated: best wall ms, eager deferred modules, self time per package"""
+    with tempfile.TemporaryDirectory() as workdir:
+        runs = [run_probe(workdir) for _ in range(IMPORT_RUNS)]
+        best = min(float(run.stdout.splitlines()[-2]) for run in runs)
+        eager = [m for m in runs[0].stdout.splitlines()[-1].split(",") if m]
+        packages = Counter()
+        for line in run_probe(workdir, "-X", "importtime").stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, _, name = line[len("import time:"):].split("|")
+            packages[name.strip().split(".")[0]] += int(self_us)
+    return best, eager, packages
+
+def write_dataset(workdir, records):
+    sections = [{
+        "title": f"Section {s}", "emoji": "🌿", "description": "",
+        "products": [
+            {"name": f"Product {s}-{p}", "specs": "3.5g · indica", "price": "200 kr", "notes": "",
+             "status": "available", "nft_id": None, "ai_generated": False}
+            for p in range(records // 10)
+        ]
+    } for s in range(10)]
+    with open(f"{workdir}/catalog.json", "w") as f:
+        json.dump({"brand": "NTRLI'", "sections": sections, "premium_tiers": [], "info": {},
+                   "ai_insights": [], "nft_catalog": []}, f)
+
+    os.makedirs(f"{workdir}/nft_assets")
+    nfts = [{
+        "nft_id": f"{i:064x}", "product_name": f"Product {i}", "section_name": f"Section {i % 10}",
+        "nft_file": f"nft_assets/{i:064x}_nft.png", "assets": {}, "asset_hashes": {}, "original_file": None,
+        "metadata": {}, "created_timestamp": 1.7e9 + i, "owner": None
+    } for i in range(records)]
+    ownership = {nft["nft_id"]: {"owner_id": i, "acquired_timestamp": 1.7e9} for i, nft in enumerate(nfts[::2])}
+    refs = {f"{i:064x}": {"kind": "photo", "id": i, "access_hash": i, "file_reference": "AAAA"} for i in range(records)}
+    subs = [Subscription(i, "standard").to_dict() for i in range(records)]
+    for path, data in (
+        (f"{workdir}/nft_assets/registry.json", {"nfts": nfts, "ownership": ownership}),
+        (f"{workdir}/nft_assets/file_refs.json", refs),
+        (f"{workdir}/subscriptions.json", {"subscriptions": subs}),
+    ):
+        with open(path, "w") as f:
+            json.dump({"seq": 0, "data": data}, f)
+    with open(f"{workdir}/milestones.json", "w") as f:
+        f.writelines(json.dumps({"type": "nft_batch", "scope": f"Section {i % 10}", "count": i}) + "\n" for i in range(records))
+
+def build_layers(workdir, autoload):
+    catalog = CatalogManager(f"{workdir}/catalog.json", autoload=autoload)
+    return (
+        catalog,
+        SubscriptionManager(f"{workdir}/subscriptions.json", autoload=autoload),
+        NFTEcosystem(f"{workdir}/nft_assets", catalog_manager=catalog, autoload=autoload),
+        FileRefCache(f"{workdir}/nft_assets", autoload=autoload),
+        EcosystemAI(milestones_file=f"{workdir}/milestones.json", autoload=autoload),
+    )
+
+async def ticker(stalls):
+    """Record the longest gap between 1 ms ticks: how long the loop could not serve anything"""
+    last = time.perf_counter()
+    while True:
+        await asyncio.sleep(0.001)
+        now = time.perf_counter()
+        stalls.append(now - last)
+        last = now
+
+async def eager_startup(workdir):
+    """Previous order: parse everything on the loop, then connect"""
+    stalls = []
+    tick = asyncio.create_task(ticker(stalls))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    build_layers(workdir, autoload=True)
+    await asyncio.sleep(CONNECT_MS / 1000)
+    ready = time.perf_counter() - started
+    tick.cancel()
+    return ready, max(stalls)
+
+async def deferred_startup(workdir):
+    """bot_updated order: layers load in threads while the handshake is in flight"""
+    stalls = []
+    tick = asyncio.create_task(ticker(stalls))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    layers = build_layers(workdir, autoload=False)
+    loading = asyncio.gather(*(asyncio.to_thread(layer.load) for layer in layers))
+    await asyncio.sleep(CONNECT_MS / 1000)
+    await loading
+    ready = time.perf_counter() - started
+    tick.cancel()
+    return ready, max(stalls)
+
+def main():
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    import_ms, eager_modules, packages = import_profile()
+    print(f"import bot_updated:   {import_ms:.1f} ms (budget {IMPORT_BUDGET_MS:.0f} ms, best of {IMPORT_RUNS})")
+    for name, self_us in packages.most_common(6):
+        print(f"  {name:<20}{self_us / 1000:.1f} ms")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        write_dataset(workdir, records)
+        eager_ready, eager_stall = asyncio.run(eager_startup(workdir))
+        deferred_ready, deferred_stall = asyncio.run(deferred_startup(workdir))
+    print(f"records/store:        {records}")
+    print(f"connect (simulated):  {CONNECT_MS:.0f} ms")
+    print(f"eager ready:          {eager_ready * 1000:.1f} ms (longest loop stall {eager_stall * 1000:.1f} ms)")
+    print(f"deferred ready:       {deferred_ready * 1000:.1f} ms (longest loop stall {deferred_stall * 1000:.1f} ms)")
+
+    failed = False
+    if import_ms > IMPORT_BUDGET_MS:
+        print(f"FAIL: import over budget by {import_ms - IMPORT_BUDGET_MS:.1f} ms")
+        failed = True
+    if eager_modules:
+        print(f"FAIL: imported at startup instead of first use: {', '.join(eager_modules)}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
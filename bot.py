@@ -1,13 +1,14 @@
 #!/usr/bin/env python3
 import asyncio, os
-from threading import Thread
-from queue import Queue
 from telethon import TelegramClient, events
 from dotenv import load_dotenv
 from ai import HybridAI
-from self_heal import self_heal, auto_retry
+from self_heal import self_heal, auto_retry, setup_self_heal_logging
 from nft import convert_to_nft
-from heartbeat import run_flask
+from media_ingest import ingest_media, MediaTooLarge, MAX_MEDIA_BYTES
+from heartbeat import Heartbeat
+from metrics import MetricsRegistry
+from loopmon import LoopMonitor
 
 # Live state
 BOT_IS_ACTIVE = False
@@ -27,12 +28,20 @@ except Exception as e:
     raise e
 
 # AI WORKER
-mistral_queue = Queue()
+mistral_queue = asyncio.Queue()
 ai_engine = HybridAI(memory_limit=MEMORY_LIMIT)
 
+# HEARTBEAT + METRICS (same loop as the bot)
+metrics = MetricsRegistry()
+heartbeat = Heartbeat(metrics)
+metrics.gauge("queue_depth", "Jobs waiting in the queue", lambda: [({"queue": "ai"}, mistral_queue.qsize())])
+metrics.check("telegram", lambda: BOT_IS_ACTIVE and client.is_connected())
+loop_monitor = LoopMonitor()
+loop_monitor.register(metrics)
+
 async def ai_worker():
     while True:
-        event, prompt = mistral_queue.get()
+        event, prompt = await mistral_queue.get()
         try:
             response = await ai_engine.generate(prompt)
             await event.respond(response)
@@ -41,7 +50,6 @@ async def ai_worker():
             await event.respond("Fejl i AI. Self-heal aktiveret.")
         finally:
             mistral_queue.task_done()
-        await asyncio.sleep(0.01)
 
 # POST-PREPROMPTED LIVE-ONLY DECORATOR
 def live_only(func):
@@ -63,7 +71,7 @@ async def start(event):
 @live_only
 async def ask_ai(event):
     question = event.message.raw_text.replace("/ask", "").strip()
-    if question: mistral_queue.put((event, question))
+    if question: mistral_queue.put_nowait((event, question))
     else: await event.respond("Brug: /ask dit_spørgsmål")
 
 @client.on(events.NewMessage(pattern="/nft"))
@@ -71,8 +79,11 @@ async def ask_ai(event):
 async def nft_command(event):
     reply = await event.get_reply_message()
     if reply and reply.media:
-        img_path = await reply.download_media()
-        nft_file = convert_to_nft(img_path)
+        try: media = await ingest_media(reply)
+        except MediaTooLarge:
+            await event.respond(f"Billedet er for stort (max {MAX_MEDIA_BYTES // (1024 * 1024)} MB)")
+            return
+        with media: nft_file = convert_to_nft(media)
         if nft_file: await event.respond("NFT genereret", file=nft_file)
         else: await event.respond("Fejl ved NFT-konvertering")
     else: await event.respond("Svar på et billede")
@@ -94,11 +105,13 @@ async def user_id(event): await event.respond(f"{event.sender_id}")
 # MAIN LOOP
 async def main():
     global BOT_IS_ACTIVE
+    asyncio.create_task(heartbeat.serve())
+    asyncio.create_task(loop_monitor.run())
     BOT_IS_ACTIVE = True
     await client.start(bot_token=BOT_TOKEN)
     asyncio.create_task(ai_worker())
     await client.run_until_disconnected()
 
 if __name__ == "__main__":
-    Thread(target=run_flask).start()
+    setup_self_heal_logging()
     asyncio.run(main())
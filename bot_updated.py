@@ -5,60 +5,280 @@ Integrates: Catalog + AI + NFT + Subscriptions + Self-Heal + Heartbeat
 You are the algorithm. Everything is controlled by you.
 """
 
-import asyncio, os
-from threading import Thread
-from queue import Queue
+import asyncio, os, time
+from functools import partial
 from telethon import TelegramClient, events
-from dotenv import load_dotenv
-from self_heal import self_heal, auto_retry
-from heartbeat import run_flask
+from dotenv import load_dotenv, find_dotenv, dotenv_values
+from self_heal import self_heal, auto_retry, suppressor, setup_self_heal_logging
+from log_pipeline import dropped_records
+from retry import RETRY_BUDGET
+from heartbeat import Heartbeat
+from media_ingest import ingest_media, MediaTooLarge, MAX_MEDIA_BYTES
 
 # IMPORT ECOSYSTEM LAYERS
 from ai_ecosystem import EcosystemAI
 from catalog import CatalogManager
-from subscriptions import SubscriptionManager
-from admin_panel import AdminPanel
+from subscriptions import SubscriptionManager, load_tiers
+from admin_panel import AdminPanel, ADMIN_ID
 from nft_ecosystem import NFTEcosystem
+from file_ref_cache import FileRefCache
+from broadcast import Broadcaster
+from outbound import OutboundDispatcher, split_message
+from response_cache import ResponseCache
+from router import CommandRouter, parse_command
+from admission import AdmissionController
+from deadlines import Deadline, DeadlineExceeded
+from metrics import MetricsRegistry, CommandStats
+from loopmon import LoopMonitor
+from hot_reload import HotReloader
 
 BOT_IS_ACTIVE = False
 
 # ENVIRONMENT
-load_dotenv()
+ENV_FILE = find_dotenv() or os.path.abspath(".env")
+load_dotenv(ENV_FILE)
 API_ID = int(os.getenv("API_ID"))
 API_HASH = os.getenv("API_HASH")
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 MEMORY_LIMIT = int(os.getenv("MEMORY_LIMIT", 20))
+AI_JOB_DEADLINE = float(os.getenv("AI_JOB_DEADLINE", 90))    # seconds from /ask to answer
+NFT_JOB_DEADLINE = float(os.getenv("NFT_JOB_DEADLINE", 120)) # seconds from /nft to upload
+MY_NFTS_LIMIT = int(os.getenv("MY_NFTS_LIMIT", 5))           # newest owned NFTs re-sent by /my_nfts
+
+# STATIC RESPONSES - built once at import, never per request
+START_TEXT = """
+🌒   N T R L I '   S E L E C T I O N
+━━━━━━━━━━━━━━━━━━━━━━━━
+
+**Det her er ikke bare noget du tilvælger, det er noget du genkender.**
+
+📋 /menu - Overblik over menuen
+💎 /premium - FÅ NTRLI' PREMIUM
+💬 /ask - Spørg AI en ting
+🎨 /nft - Generer NFT
+🖼 /my_nfts - Dine NFTs
+❓ /info - Levering & åbningstider
+📞 /contact - Find mig
+
+━━━━━━━━━━━━━━━━━━━━━━━━
+"""
+
+def premium_offer_text(tiers):
+    """The /premium offer, built from the (hot-reloadable) tier table (cached as premium_offer)"""
+    rule = "━━━━━━━━━━━━━━━━━━━━━━━━"
+    blocks = []
+    for tier in tiers.values():
+        perks = list(tier.get("perks", ()))
+        if tier.get("stars"):
+            perks.append(f"{tier['stars']} stjerner / måned")
+        block = f"{tier.get('emoji', '💎')} **{tier['title']}**\n{tier['monthly']} kr/måned · {tier['yearly']} kr/år"
+        if perks:
+            block += "\n\n" + "\n".join(f"✅ {perk}" for perk in perks)
+        blocks.append(block)
+    body = f"\n\n{rule}\n\n".join(blocks)
+    return f"\n💎 **FÅ NTRLI' PREMIUM**\n{rule}\n\n{body}\n\n{rule}\n\n📧 PM for subscription detaljer\n"
+
+INFO_TEXT = """
+🚚   L E V E R I N G   &   I N F O
+━━━━━━━━━━━━━━━━━━━━━━━━
+
+📦 Levering fra 500 kr
+🏠 Selvhent i Lindholm
+📞 Skriv, vi finder ud af det
+
+🕜   Å B N I N G S T I D E R
+━━━━━━━━━━━━━━━━━━━━━━━━
+
+Man – Tor · 13:30 – 21:00
+Fre – Lør · 15:30 – 01:00
+Søndag · Lukket
+
+🛡️ **Fokus på sikkerhed & harm reduction**
+
+Alle produkter udvælges med omtanke.
+Intet overflødigt intet tilfældigt.
+"""
+
+CONTACT_TEXT = """
+📞   K O N T A K T
+━━━━━━━━━━━━━━━━━━━━━━━━
+
+💬 PM mig: @Sir_NTRLI_II
+🔗 Premium: https://t.me/+z7AO7r1c16BiODZk
+🔗 Advanced: https://t.me/+gnx2ZsLT-epmY2U0
+"""
 
 # TELEGRAM CLIENT
 try:
-    client = TelegramClient("BotSession", API_ID, API_HASH)
+    # flood_sleep_threshold=0: every FloodWait is raised to the outbound dispatcher, which pauses only
+    # the flooded chat; Telethon would otherwise sleep inside send_message and stall every sender
+    client = TelegramClient("BotSession", API_ID, API_HASH, flood_sleep_threshold=0)
 except Exception as e:
     self_heal(f"TelegramClient init failed: {e}")
     raise e
 
-# ECOSYSTEM INITIALIZATION
+# ECOSYSTEM INITIALIZATION - layers are wired now, their data files are parsed after
+# connect starts (load_layers); handlers wait on layers_ready until then
 print("[ECOSYSTEM] Initializing layers...")
 
-ai_engine = EcosystemAI(memory_limit=MEMORY_LIMIT)
-catalog = CatalogManager(ai_engine=ai_engine)
-subscriptions = SubscriptionManager()
-nft_layer = NFTEcosystem(catalog_manager=catalog)
-admin = AdminPanel(catalog, subscriptions, nft_layer, ai_engine)
-
-# QUEUES
-mistral_queue = Queue()
-nft_queue = Queue()
-
-print("[ECOSYSTEM] All layers live. Bot ready.")
+ai_engine = EcosystemAI(memory_limit=MEMORY_LIMIT, autoload=False)
+catalog = CatalogManager(ai_engine=ai_engine, autoload=False)
+subscriptions = SubscriptionManager(autoload=False)
+nft_layer = NFTEcosystem(catalog_manager=catalog, autoload=False)
+file_refs = FileRefCache(nft_layer.nft_dir, autoload=False)
+data_layers = (catalog, subscriptions, nft_layer, file_refs, ai_engine)
+layers_ready = asyncio.Event()
+startup_seconds = {}   # phase -> seconds, exported as a gauge
+outbound = OutboundDispatcher(client)
+broadcaster = Broadcaster(outbound, subscriptions, report_to=ADMIN_ID)
+
+# RESPONSE CACHE - menu pages + stats, invalidated by the layers they read
+response_cache = ResponseCache()
+response_cache.register("menu_pages", lambda: split_message(catalog.render_menu()), tags=("catalog",))  # /menu + /admin_view_menu
+response_cache.register("premium_offer", lambda: premium_offer_text(subscriptions.tiers), tags=("subscriptions",))
+catalog.on_change.append(response_cache.invalidator("catalog"))
+subscriptions.on_change.append(response_cache.invalidator("subscriptions"))
+nft_layer.on_change.append(response_cache.invalidator("nft"))
+perf = CommandStats()
+admin = AdminPanel(catalog, subscriptions, nft_layer, ai_engine, broadcaster, cache=response_cache, perf=perf)
+
+# ROUTING - one NewMessage handler, hash lookup per command
+router = CommandRouter()
+
+@client.on(events.NewMessage)
+async def route_command(event):
+    await router.dispatch(event)
+
+# QUEUES - depth bounded by admission control, not by the queue itself
+mistral_queue = asyncio.Queue()
+nft_queue = asyncio.Queue()
+ai_admission = AdmissionController.from_env("ai", per_user=1, target_wait=60, initial_service_time=5)
+nft_admission = AdmissionController.from_env("nft", per_user=1, target_wait=60, initial_service_time=3)
+
+BUSY_TEXT = "🚦 Travlt lige nu. Prøv igen om lidt."
+USER_LIMIT_TEXT = "⏳ Du har allerede en forespørgsel i gang. Vent på svaret."
+EXPIRED_TEXT = "⌛ Det tog for lang tid. Prøv igen."
+
+async def reject(event, verdict):
+    await event.respond(USER_LIMIT_TEXT if verdict == AdmissionController.USER_LIMIT else BUSY_TEXT)
+
+# HOT RELOAD - external edits to catalog.json, TIERS_FILE and .env are swapped in without a restart;
+# each layer's on_change hook invalidates only the cached responses built from it
+RELOADABLE_ENV = {"MEMORY_LIMIT": lambda value: ai_engine.set_memory_limit(int(value))}
+env_seen = dotenv_values(ENV_FILE) if os.path.exists(ENV_FILE) else {}
+
+def apply_env(values):
+    """Apply reloadable keys whose .env value changed; any other key still needs a restart"""
+    changed = {key: values[key] for key in RELOADABLE_ENV if key in values and values[key] != env_seen.get(key)}
+    for key, value in changed.items():
+        RELOADABLE_ENV[key](value)
+        os.environ[key] = value
+    env_seen.update(values)
+    if changed:
+        response_cache.invalidate("ai")
+
+reloader = HotReloader()
+reloader.watch("catalog", catalog.catalog_file, catalog.read_catalog_file, catalog.replace_catalog,
+               owner_signature=lambda: catalog.disk_signature)
+reloader.watch("tiers", subscriptions.tiers_file, load_tiers, subscriptions.set_tiers)
+reloader.watch("env", ENV_FILE, dotenv_values, apply_env)
+
+# METRICS - collectors read the layers' own counters at scrape time
+metrics = MetricsRegistry()
+perf.register(metrics)
+loop_monitor = LoopMonitor()
+loop_monitor.register(metrics)
+reloader.register(metrics)
+heartbeat = Heartbeat(metrics)
+worker_tasks = []
+job_queues = {"ai": (mistral_queue, ai_admission), "nft": (nft_queue, nft_admission)}
+journals = {"nft_registry": nft_layer.journal, "subscriptions": subscriptions.journal, "file_refs": file_refs.journal}
+
+def per_queue(read):
+    return lambda: [({"queue": name}, read(queue, admission)) for name, (queue, admission) in job_queues.items()]
+
+metrics.gauge("queue_depth", "Jobs waiting in the queue", per_queue(lambda q, a: q.qsize()))
+metrics.gauge("admission_in_flight", "Admitted jobs, queued or running", per_queue(lambda q, a: a.depth))
+metrics.gauge("admission_depth_limit", "Current adaptive admission limit", per_queue(lambda q, a: a.depth_limit))
+metrics.gauge("job_service_seconds", "EWMA job service time", per_queue(lambda q, a: a.service_time))
+metrics.counter("jobs_completed_total", "Jobs that finished service", per_queue(lambda q, a: a.completed))
+metrics.counter(
+    "worker_busy_seconds_total", "Time workers spent serving jobs; rate() is utilisation",
+    per_queue(lambda q, a: a.busy_seconds)
+)
+metrics.counter("admission_rejected_total", "Jobs refused by admission control", lambda: [
+    ({"queue": name, "reason": reason}, count)
+    for name, (_, admission) in job_queues.items()
+    for reason, count in admission.rejected.items()
+])
+metrics.counter("outbound_sent_total", "Messages sent to Telegram", lambda: outbound.sent)
+metrics.counter("outbound_merged_total", "Messages merged into another send", lambda: outbound.merged)
+metrics.counter("outbound_failed_total", "Messages that failed to send", lambda: outbound.failed)
+metrics.counter("outbound_flood_waits_total", "FloodWait errors received", lambda: outbound.flood_waits)
+metrics.gauge("outbound_pending", "Messages waiting in the dispatcher", outbound.pending)
+metrics.counter("cache_hits_total", "Cache hits", lambda: [
+    ({"cache": "responses"}, response_cache.hits), ({"cache": "file_refs"}, file_refs.hits)
+])
+metrics.counter("cache_misses_total", "Cache misses", lambda: [
+    ({"cache": "responses"}, response_cache.misses), ({"cache": "file_refs"}, file_refs.misses)
+])
+metrics.counter("persistence_flushes_total", "Persistence writes", lambda: [
+    ({"store": "catalog", "kind": "save"}, catalog.saves)
+] + [
+    item for name, journal in journals.items() for item in (
+        ({"store": name, "kind": "append"}, journal.appends),
+        ({"store": name, "kind": "compact"}, journal.compactions)
+    )
+])
+metrics.counter("persistence_flush_seconds_total", "Time spent in persistence writes", lambda: [
+    ({"store": "catalog", "kind": "save"}, catalog.save_seconds)
+] + [
+    item for name, journal in journals.items() for item in (
+        ({"store": name, "kind": "append"}, journal.append_seconds),
+        ({"store": name, "kind": "compact"}, journal.compact_seconds)
+    )
+])
+metrics.gauge("subscribers_active", "Active subscriptions", subscriptions.get_subscriber_count)
+metrics.counter("retries_total", "Retries spent from the global retry budget", lambda: RETRY_BUDGET.retries)
+metrics.counter("retry_budget_exhausted_total", "Retries refused because the budget was empty",
+                lambda: RETRY_BUDGET.exhausted)
+metrics.counter("log_records_dropped_total", "Log records dropped because the writer fell behind", dropped_records)
+metrics.counter("self_heal_suppressed_total", "Repeated self_heal messages folded into summaries",
+                lambda: suppressor.suppressed)
+metrics.gauge("startup_phase_seconds", "Time spent in each startup phase", lambda: [
+    ({"phase": phase}, seconds) for phase, seconds in startup_seconds.items()
+])
+metrics.check("layers", layers_ready.is_set)
+metrics.check("telegram", lambda: BOT_IS_ACTIVE and client.is_connected())
+metrics.check("workers", lambda: bool(worker_tasks) and not any(task.done() for task in worker_tasks))
+
+async def load_layers():
+    """Parse every layer's data files in worker threads, concurrently with each other and the handshake"""
+    started = time.perf_counter()
+    await asyncio.gather(*(asyncio.to_thread(layer.load) for layer in data_layers))
+    startup_seconds["layers"] = time.perf_counter() - started
+    layers_ready.set()
+    print(f"[ECOSYSTEM] All layers live ({startup_seconds['layers'] * 1000:.0f} ms).")
 
 # AI WORKER THREAD
 async def ai_worker():
     """Process AI requests from queue"""
     while True:
+        event, deadline, prompt = await mistral_queue.get()
+        started = time.monotonic()
+        perf.observe_stage("ai", "queue_wait", deadline.elapsed())
         try:
-            event, prompt = mistral_queue.get()
-            response = await ai_engine.generate(prompt, context_user_id=event.sender_id)
-            await event.respond(response)
+            # Expired while queued: dropped before spending a backend call on it
+            with perf.stage("ai", "backend"):
+                response = await deadline.run(ai_engine.generate(prompt, context_user_id=event.sender_id))
+            response_cache.invalidate("ai")
+            with perf.stage("ai", "send"):
+                await event.respond(response)
+        except DeadlineExceeded:
+            try:
+                await event.respond(EXPIRED_TEXT)
+            except:
+                pass  # e.g. the user blocked the bot while waiting; the worker must keep running
         except Exception as e:
             self_heal(f"AI worker error: {e}")
             try:
@@ -66,28 +286,46 @@ async def ai_worker():
             except:
                 pass
         finally:
+            ai_admission.release(event.sender_id, time.monotonic() - started)
             mistral_queue.task_done()
-        await asyncio.sleep(0.01)
 
 # NFT WORKER THREAD
 async def nft_worker():
     """Process NFT conversion requests from queue"""
     while True:
+        event, deadline, media, product_name, section_name = await nft_queue.get()
+        started = time.monotonic()
+        perf.observe_stage("nft", "queue_wait", deadline.elapsed())
         try:
-            event, img_path, product_name, section_name = nft_queue.get()
-            nft_id, nft_file = nft_layer.generate_product_nft(product_name, section_name, "product_specs")
+            deadline.check()
+            # Render off the loop; the render stops at its checkpoint once the deadline passes
+            with perf.stage("nft", "render"):
+                nft = await asyncio.get_running_loop().run_in_executor(
+                    None,
+                    partial(nft_layer.render_image_nft, media, product_name, section_name, deadline=deadline)
+                )
+            nft_id, nft_file = nft["nft_id"], nft["nft_file"]
             
-            if nft_id and nft_file:
+            with perf.stage("nft", "register"):
+                registered = nft_layer.register_nfts([nft])
+            if registered:
                 # Assign to user if subscriber
-                sub = subscriptions.get_subscription(event.sender_id)
+                sub = subscriptions.get_active_subscription(event.sender_id)
                 if sub:
                     nft_layer.assign_nft_ownership(nft_id, event.sender_id)
                 
                 await event.respond(f"✅ NFT Generated: {nft_id}\n🎨 Asset ready")
                 if os.path.exists(nft_file):
-                    await event.respond(file=nft_file)
+                    asset_hash = nft.get("asset_hashes", {}).get("full")
+                    with perf.stage("nft", "upload"):
+                        await deadline.run(file_refs.send_file(event, nft_file, asset_hash=asset_hash))
             else:
                 await event.respond("❌ NFT generation failed")
+        except DeadlineExceeded:
+            try:
+                await event.respond(EXPIRED_TEXT)
+            except:
+                pass  # e.g. the user blocked the bot while waiting; the worker must keep running
         except Exception as e:
             self_heal(f"NFT worker error: {e}")
             try:
@@ -95,15 +333,23 @@ async def nft_worker():
             except:
                 pass
         finally:
+            media.close()
+            nft_admission.release(event.sender_id, time.monotonic() - started)
             nft_queue.task_done()
-        await asyncio.sleep(0.01)
 
 def live_only(func):
-    """Decorator: only run if bot is active"""
-    async def wrapper(*args, **kwargs):
+    """Decorator: only run if bot is active; responses go through the outbound dispatcher.
+    Also the instrumentation point: latency histogram, error count and in-flight gauge per command."""
+    async def wrapper(event, *args, **kwargs):
         if not BOT_IS_ACTIVE: return
+        if not layers_ready.is_set():
+            await layers_ready.wait()  # updates that arrive during startup are held, not dropped
+        command = parse_command(event.raw_text)[0]
+        if command not in router.routes:
+            command = func.__name__  # prefix fallbacks: keep label cardinality bounded
         try: 
-            return await func(*args, **kwargs)
+            with perf.command(command):
+                return await func(outbound.wrap(event), *args, **kwargs)
         except Exception as e:
             self_heal(f"Live-only extension failed: {e}")
     return wrapper
@@ -112,160 +358,135 @@ def live_only(func):
 # PUBLIC COMMANDS
 # ============================================================================
 
-@client.on(events.NewMessage(pattern="/start"))
+@router.command("/start")
 @live_only
 async def start(event):
-    msg = """
-🌒   N T R L I '   S E L E C T I O N
-━━━━━━━━━━━━━━━━━━━━━━━━
-
-**Det her er ikke bare noget du tilvælger, det er noget du genkender.**
+    await event.respond(START_TEXT)
 
-📋 /menu - Overblik over menuen
-💎 /premium - FÅ NTRLI' PREMIUM
-💬 /ask - Spørg AI en ting
-🎨 /nft - Generer NFT
-❓ /info - Levering & åbningstider
-📞 /contact - Find mig
-
-━━━━━━━━━━━━━━━━━━━━━━━━
-    """
-    await event.respond(msg)
-
-@client.on(events.NewMessage(pattern="/menu"))
+@router.command("/menu")
 @live_only
 async def menu(event):
     try:
-        menu_text = catalog.render_menu()
-        await event.respond(menu_text)
+        for page in response_cache.get("menu_pages"):
+            await event.respond(page)
     except Exception as e:
         self_heal(f"Menu command failed: {e}")
         await event.respond("Fejl ved indlæsning af menu")
 
-@client.on(events.NewMessage(pattern="/ask"))
+@router.command("/ask")
 @live_only
 async def ask_ai(event):
     try:
-        question = event.message.raw_text.replace("/ask", "").strip()
+        question = parse_command(event.message.raw_text)[1]  # drops "/ask" and "/ask@BotName" alike
         if question:
-            mistral_queue.put((event, question))
+            verdict = ai_admission.try_admit(event.sender_id)
+            if verdict != AdmissionController.ADMITTED:
+                await reject(event, verdict)
+                return
+            mistral_queue.put_nowait((event, Deadline(AI_JOB_DEADLINE), question))
             await event.respond("⏳ AI thinking...")
         else:
             await event.respond("Usage: /ask dit_spørgsmål")
     except Exception as e:
         self_heal(f"Ask command failed: {e}")
 
-@client.on(events.NewMessage(pattern="/nft"))
+@router.command("/nft")
 @live_only
 async def nft_command(event):
     try:
         reply = await event.get_reply_message()
         if reply and reply.media:
-            img_path = await reply.download_media()
+            # Admit before downloading: a rejected job costs no memory
+            verdict = nft_admission.try_admit(event.sender_id)
+            if verdict != AdmissionController.ADMITTED:
+                await reject(event, verdict)
+                return
+            try:
+                # Bounded in-memory download, handed straight to the renderer
+                media = await ingest_media(reply)
+            except BaseException:
+                nft_admission.release(event.sender_id)
+                raise
             
             # Get product context from message
             product_name = "NTRLI' Product"
             section_name = "Premium Selection"
             
-            nft_queue.put((event, img_path, product_name, section_name))
+            nft_queue.put_nowait((event, Deadline(NFT_JOB_DEADLINE), media, product_name, section_name))
             await event.respond("⏳ Generating NFT...")
         else:
             await event.respond("Reply to an image with /nft to generate NFT")
+    except MediaTooLarge:
+        await event.respond(f"❌ Image too large (max {MAX_MEDIA_BYTES // (1024 * 1024)} MB)")
     except Exception as e:
         self_heal(f"NFT command failed: {e}")
         await event.respond("NFT generation error")
 
-@client.on(events.NewMessage(pattern="/premium"))
+@router.command("/my_nfts")
+@live_only
+async def my_nfts(event):
+    try:
+        owned = sorted(nft_layer.get_user_nfts(event.sender_id), key=lambda nft: nft["created_timestamp"])
+        owned = [nft for nft in owned if os.path.exists(nft["nft_file"])][-MY_NFTS_LIMIT:]
+        if not owned:
+            await event.respond("Du ejer ingen NFTs endnu\n🎨 Svar på et billede med /nft")
+            return
+        for nft in owned:
+            # Re-send by Telegram reference: the bytes were uploaded when the NFT was minted
+            await file_refs.send_file(
+                event, nft["nft_file"], asset_hash=nft.get("asset_hashes", {}).get("full"),
+                message=f"🎨 {nft['nft_id']} · {nft['product_name']}"
+            )
+    except Exception as e:
+        self_heal(f"My NFTs command failed: {e}")
+        await event.respond("Fejl ved indlæsning af dine NFTs")
+
+@router.command("/premium")
 @live_only
 async def premium(event):
     try:
-        sub = subscriptions.get_subscription(event.sender_id)
-        if sub:
+        sub = subscriptions.get_active_subscription(event.sender_id)
+        paused = subscriptions.get_subscription(event.sender_id)
+        if not sub and paused:
+            renewal = subscriptions.get_renewal_date(event.sender_id)
+            await event.respond(
+                f"⏸ **PREMIUM PÅ PAUSE**\n\nTier: {subscriptions.tier_title(paused.tier)}\nResterende: {renewal} dage\n\n"
+                "🌀 /resume_sub - Genoptag\n🌀 /cancel_sub - Opsig"
+            )
+        elif sub:
             renewal = subscriptions.get_renewal_date(event.sender_id)
+            # A cancelled subscription stays active until the period ends, then expires
+            ends = "Fornyer om" if sub.auto_renew else "Udløber om"
+            cancel = "🌀 /cancel_sub - Opsig når som helst" if sub.auto_renew else "🌀 Opsagt - fornyes ikke"
             msg = f"""
 ✨ **DU ER PREMIUM**
 
-Tier: {sub['tier']}
-Fornyer om: {renewal} dage
+Tier: {subscriptions.tier_title(sub.tier)}
+{ends}: {renewal} dage
 
 🌀 /pause_sub - Sæt på pause
-🌀 /cancel_sub - Opsig når som helst
+{cancel}
 
 ━━━━━━━━━━━━━━━━━━━━━━━━
 Ingen gebyrer. Hurtigt og uden gebyr.
             """
             await event.respond(msg)
         else:
-            msg = """
-💎 **FÅ NTRLI' PREMIUM**
-━━━━━━━━━━━━━━━━━━━━━━━━
-
-🔒 **Premium Standard**
-200 kr/måned · 1500 kr/år
-
-✅ Eksklusive tilbud 💰
-✅ Early access til weed 🍂
-✅ Billigere røg fra dag 1 💵
-✅ Forum adgang 🏛
-✅ 1500 stjerner / måned
-
-━━━━━━━━━━━━━━━━━━━━━━━━
-
-⭐ **Premium Advanced**
-400 kr/måned · 1500 kr/år
-
-✅ Unlimited early access 📛
-✅ Eksklusive micro-batches ❤️‍🔥
-✅ Extended forum access ⚡️
-✅ 3000 stjerner / måned
-
-━━━━━━━━━━━━━━━━━━━━━━━━
-
-📧 PM for subscription detaljer
-            """
-            await event.respond(msg)
+            await event.respond(response_cache.get("premium_offer"))
     except Exception as e:
         self_heal(f"Premium command failed: {e}")
 
-@client.on(events.NewMessage(pattern="/info"))
+@router.command("/info")
 @live_only
 async def info(event):
-    msg = """
-🚚   L E V E R I N G   &   I N F O
-━━━━━━━━━━━━━━━━━━━━━━━━
-
-📦 Levering fra 500 kr
-🏠 Selvhent i Lindholm
-📞 Skriv, vi finder ud af det
-
-🕜   Å B N I N G S T I D E R
-━━━━━━━━━━━━━━━━━━━━━━━━
-
-Man – Tor · 13:30 – 21:00
-Fre – Lør · 15:30 – 01:00
-Søndag · Lukket
-
-🛡️ **Fokus på sikkerhed & harm reduction**
+    await event.respond(INFO_TEXT)
 
-Alle produkter udvælges med omtanke.
-Intet overflødigt intet tilfældigt.
-    """
-    await event.respond(msg)
-
-@client.on(events.NewMessage(pattern="/contact"))
+@router.command("/contact")
 @live_only
 async def contact(event):
-    msg = """
-📞   K O N T A K T
-━━━━━━━━━━━━━━━━━━━━━━━━
-
-💬 PM mig: @Sir_NTRLI_II
-🔗 Premium: https://t.me/+z7AO7r1c16BiODZk
-🔗 Advanced: https://t.me/+gnx2ZsLT-epmY2U0
-    """
-    await event.respond(msg)
+    await event.respond(CONTACT_TEXT)
 
-@client.on(events.NewMessage(pattern="/pause_sub"))
+@router.command("/pause_sub")
 @live_only
 async def pause_sub(event):
     if subscriptions.pause_subscription(event.sender_id):
@@ -273,7 +494,7 @@ async def pause_sub(event):
     else:
         await event.respond("❌ Ingen aktiv subscription")
 
-@client.on(events.NewMessage(pattern="/resume_sub"))
+@router.command("/resume_sub")
 @live_only
 async def resume_sub(event):
     if subscriptions.resume_subscription(event.sender_id):
@@ -281,11 +502,11 @@ async def resume_sub(event):
     else:
         await event.respond("❌ Ingen paused subscription")
 
-@client.on(events.NewMessage(pattern="/cancel_sub"))
+@router.command("/cancel_sub")
 @live_only
 async def cancel_sub(event):
     if subscriptions.cancel_subscription(event.sender_id):
-        await event.respond("✅ Subscription opsagt")
+        await event.respond("✅ Subscription opsagt\nDu beholder premium til perioden udløber (/premium)")
     else:
         await event.respond("❌ Ingen aktiv subscription")
 
@@ -293,7 +514,7 @@ async def cancel_sub(event):
 # ADMIN COMMANDS
 # ============================================================================
 
-@client.on(events.NewMessage(pattern="/admin"))
+@router.command(*admin.commands)
 @live_only
 async def admin_command(event):
     try:
@@ -302,21 +523,37 @@ async def admin_command(event):
     except Exception as e:
         self_heal(f"Admin command error: {e}")
 
+# Unknown /admin_* commands still reach the panel's "unknown command" reply
+router.add_prefix("/admin", admin_command)
+
 # ============================================================================
 # MAIN LOOP
 # ============================================================================
 
 async def main():
     global BOT_IS_ACTIVE
+    asyncio.create_task(heartbeat.serve())
+    asyncio.create_task(loop_monitor.run())
     BOT_IS_ACTIVE = True
     print("[ECOSYSTEM] Bot starting...")
+    loading = asyncio.create_task(load_layers())
+    started = time.perf_counter()
     await client.start(bot_token=BOT_TOKEN)
+    startup_seconds["connect"] = time.perf_counter() - started
+    await loading
     print("[ECOSYSTEM] Bot online. All systems live.")
-    asyncio.create_task(ai_worker())
-    asyncio.create_task(nft_worker())
+    response_cache.warm()
+    worker_tasks.extend([
+        asyncio.create_task(outbound.run()),
+        asyncio.create_task(ai_worker()),
+        asyncio.create_task(nft_worker()),
+        asyncio.create_task(subscriptions.scheduler.run()),
+        asyncio.create_task(reloader.run()),
+    ])
+    broadcaster.resume_pending()
     await client.run_until_disconnected()
 
 if __name__ == "__main__":
+    setup_self_heal_logging()
     print("[ECOSYSTEM] Starting NTRLI' Superbot Ecosystem...")
-    Thread(target=run_flask).start()
     asyncio.run(main())
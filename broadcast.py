@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+ECOSYSTEM BROADCAST: Deliver admin notifications to subscribers
+Bounded concurrency, bulk-priority sends through the outbound dispatcher, crash-resumable checkpoints.
+"""
+
+import asyncio, os, time, uuid
+from journal import Journal
+from outbound import BULK, INTERACTIVE
+from retry import retry_async, RetryPolicy
+from self_heal import self_heal
+
+BROADCAST_DIR = os.getenv("BROADCAST_DIR", "broadcasts")
+BROADCAST_CONCURRENCY = int(os.getenv("BROADCAST_CONCURRENCY", 8))
+CHECKPOINT_EVERY = 50     # delivery results per checkpoint append
+DELIVERY_RETRY = RetryPolicy(attempts=3, base_delay=1.0)   # per recipient
+
+class BroadcastJob:
+    def __init__(self, job_id, tier, message, created=None):
+        self.job_id = job_id
+        self.tier = tier
+        self.message = message
+        self.created = created or time.time()
+        self.total = 0
+        self.delivered = 0
+        self.failed = 0
+        self.finished = None
+        self.task = None
+
+    @property
+    def running(self):
+        return self.task is not None and not self.task.done()
+
+    def to_dict(self):
+        return {"job_id": self.job_id, "tier": self.tier, "message": self.message, "created": self.created}
+
+class Broadcaster:
+    def __init__(self, outbound, subscriptions, report_to=None, state_dir=BROADCAST_DIR,
+                 concurrency=BROADCAST_CONCURRENCY):
+        self.outbound = outbound    # OutboundDispatcher: rate limits + FloodWait live there
+        self.subscriptions = subscriptions
+        self.report_to = report_to  # chat that receives completion reports (admin)
+        self.state_dir = state_dir
+        self.concurrency = concurrency
+        self.jobs = {}
+
+    def _checkpoint(self, job_id):
+        return Journal(
+            f"{self.state_dir}/{job_id}.json",
+            f"{self.state_dir}/{job_id}.log",
+            compact_every=float("inf")
+        )
+
+    def start(self, tier, message):
+        """Start a broadcast to active subscribers (tier=None for all)"""
+        job = BroadcastJob(uuid.uuid4().hex[:12], tier, message)
+        checkpoint = self._checkpoint(job.job_id)
+        checkpoint.append({"type": "start", "job": job.to_dict()})
+        self._launch(job, checkpoint, done=set())
+        return job
+
+    def resume_pending(self):
+        """Resume broadcasts interrupted by a crash/restart; returns the resumed jobs"""
+        resumed = []
+        try:
+            if not os.path.exists(self.state_dir):
+                return resumed
+            for name in sorted(os.listdir(self.state_dir)):
+                if not name.endswith(".log"):
+                    continue
+                job_id = name[:-len(".log")]
+                if job_id in self.jobs:
+                    continue
+                checkpoint = self._checkpoint(job_id)
+                _, ops = checkpoint.load({})
+                if not ops or ops[0]["type"] != "start":
+                    continue
+                job = BroadcastJob(**ops[0]["job"])
+                done = set()
+                for op in ops[1:]:
+                    if op["type"] == "results":
+                        done.update(op["delivered"])
+                        done.update(op["failed"])
+                        job.delivered += len(op["delivered"])
+                        job.failed += len(op["failed"])
+                self._launch(job, checkpoint, done)
+                resumed.append(job)
+        except Exception as e:
+            self_heal(f"Broadcast resume failed: {e}")
+        return resumed
+
+    def _launch(self, job, checkpoint, done):
+        self.jobs[job.job_id] = job
+        job.task = asyncio.create_task(self._run(job, checkpoint, done))
+
+    async def _run(self, job, checkpoint, done):
+        started = time.monotonic()
+        recipients = self.subscriptions.notify_premium_users(job.tier)
+        job.total = len(set(recipients) | done)
+        pending = iter([user_id for user_id in recipients if user_id not in done])
+        results = {"delivered": [], "failed": []}
+
+        def flush():
+            if results["delivered"] or results["failed"]:
+                checkpoint.append({"type": "results", **results})
+                results["delivered"] = []
+                results["failed"] = []
+
+        async def worker():
+            for user_id in pending:
+                if await self._deliver(user_id, job.message):
+                    job.delivered += 1
+                    results["delivered"].append(user_id)
+                else:
+                    job.failed += 1
+                    results["failed"].append(user_id)
+                if len(results["delivered"]) + len(results["failed"]) >= CHECKPOINT_EVERY:
+                    flush()
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+            flush()
+            job.finished = time.time()
+            self._clear_checkpoint(checkpoint)
+            await self._report(
+                f"✅ Broadcast {job.job_id} done\n"
+                f"Delivered: {job.delivered} · Failed: {job.failed} · "
+                f"{time.monotonic() - started:.1f}s"
+            )
+        except asyncio.CancelledError:
+            flush()
+            raise
+        except Exception as e:
+            flush()
+            self_heal(f"Broadcast {job.job_id} stopped: {e}")
+            await self._report(f"⚠️ Broadcast {job.job_id} stopped. Resumes on restart.")
+
+    async def _deliver(self, user_id, message):
+        """Send one message at bulk priority; True when delivered"""
+        # Blocked bot, deleted account, bad peer are permanent; FloodWait is retried by the dispatcher
+        result = await retry_async(
+            self.outbound.send_message, user_id, message, priority=BULK,
+            policy=DELIVERY_RETRY, label=f"Broadcast to {user_id}"
+        )
+        return result.ok
+
+    async def _report(self, text):
+        if self.report_to is None:
+            return
+        try:
+            await self.outbound.send_message(self.report_to, text, priority=INTERACTIVE)
+        except Exception as e:
+            self_heal(f"Broadcast report failed: {e}")
+
+    def _clear_checkpoint(self, checkpoint):
+        checkpoint.close()
+        for path in (checkpoint.snapshot_file, checkpoint.log_file):
+            if os.path.exists(path):
+                os.remove(path)
@@ -2,22 +2,119 @@
 """
 ECOSYSTEM CORE: Catalog Management
 Integrates with AI, NFT, self-heal, subscriptions, and heartbeat
+The catalog is published as immutable, versioned snapshots: writers build the next version
+(sharing every unchanged section and product) and swap it in, readers never take a lock.
 """
 
-import json, os, asyncio
-from self_heal import self_heal
+import json, os, asyncio, threading, time
+from contextlib import contextmanager
+from types import MappingProxyType
+from self_heal import self_heal, run_callbacks
+from journal import atomic_write_json, file_signature
+
+def freeze(value):
+    """JSON data -> read-only: dicts become MappingProxyType, lists become tuples (frozen values are shared)"""
+    if isinstance(value, (MappingProxyType, tuple)):
+        return value
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+def thaw(value):
+    """Frozen data -> plain dicts and lists (a mutable copy)"""
+    if isinstance(value, (MappingProxyType, dict)):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (tuple, list)):
+        return [thaw(item) for item in value]
+    return value
+
+def _with(mapping, changes):
+    """Copy of a frozen mapping with some keys replaced"""
+    return MappingProxyType({**mapping, **{key: freeze(value) for key, value in changes.items()}})
+
+def _replace_at(items, index, item):
+    return items[:index] + (item,) + items[index + 1:]
+
+def _find(items, key, value):
+    for index, item in enumerate(items):
+        if item[key] == value:
+            return index
+    return None
+
+class CatalogSnapshot:
+    """One published catalog version; pickles as plain data so worker processes can receive it"""
+
+    __slots__ = ("version", "data")
+
+    def __init__(self, version, data):
+        self.version = version
+        self.data = freeze(data)
+
+    def __reduce__(self):
+        return CatalogSnapshot, (self.version, thaw(self.data))
+
+    @property
+    def sections(self):
+        return self.data["sections"]
+
+    def get_section(self, title):
+        index = _find(self.data["sections"], "title", title)
+        return None if index is None else self.data["sections"][index]
 
 class CatalogManager:
-    def __init__(self, catalog_file="catalog.json", ai_engine=None):
+    def __init__(self, catalog_file="catalog.json", ai_engine=None, autoload=True):
         self.catalog_file = catalog_file
         self.ai_engine = ai_engine  # HybridAI instance for AI-powered descriptions
-        self.catalog = self._load_catalog()
+        self.disk_signature = None  # file_signature() of our last load/save; other changes are external
+        self._snapshot = CatalogSnapshot(0, self._load_catalog() if autoload else self._empty_catalog())
+        self._write_lock = threading.RLock()  # serialises writers only
+        self._batch_depth = 0
+        self._dirty = False
+        self.on_change = []  # callbacks run after every (batched) mutation, e.g. cache invalidation
+        self.saves = 0
+        self.save_seconds = 0.0
+
+    @property
+    def catalog(self):
+        """Data of the current snapshot (read-only mappings and tuples)"""
+        return self._snapshot.data
+
+    @property
+    def version(self):
+        return self._snapshot.version
+
+    def snapshot(self):
+        """The current version; keep the reference for several reads that must agree with each other"""
+        return self._snapshot
+
+    def load(self):
+        """Read catalog.json now (for a manager built with autoload=False)"""
+        with self._write_lock:
+            self._snapshot = CatalogSnapshot(self._snapshot.version + 1, self._load_catalog())
+        return self
+
+    @staticmethod
+    def _empty_catalog():
+        return {"sections": [], "premium_tiers": [], "ai_insights": [], "nft_catalog": []}
+
+    def read_catalog_file(self, path=None):
+        """Parse catalog.json into frozen data without touching live state (safe in a worker thread)"""
+        with open(path or self.catalog_file, "r") as f:
+            return freeze(json.load(f))
+
+    def replace_catalog(self, catalog):
+        """Swap in an externally edited catalog (hot reload) and invalidate what was built from the old one"""
+        with self._write_lock:
+            self._snapshot = CatalogSnapshot(self._snapshot.version + 1, catalog)
+        run_callbacks(self.on_change, "Catalog")
 
     def _load_catalog(self):
         try:
             if os.path.exists(self.catalog_file):
-                with open(self.catalog_file, "r") as f:
-                    return json.load(f)
+                self.disk_signature = file_signature(self.catalog_file)
+                return self.read_catalog_file()
             return {
                 "brand": "🌒   N T R L I '   S E L E C T I O N",
                 "tagline": "Det her er ikke bare noget du tilvælger, det er noget du genkender.",
@@ -29,32 +126,60 @@ class CatalogManager:
             }
         except Exception as e:
             self_heal(f"Catalog load failed: {e}")
-            return {"sections": [], "premium_tiers": [], "ai_insights": [], "nft_catalog": []}
+            return self._empty_catalog()
+
+    def _publish(self, catalog):
+        """Make catalog the next version (one reference swap), then persist it"""
+        self._snapshot = CatalogSnapshot(self._snapshot.version + 1, catalog)
+        return self._save_catalog()
 
     def _save_catalog(self):
+        if self._batch_depth:
+            # Inside batch_updates(): flush once when the batch ends
+            self._dirty = True
+            return True
+        run_callbacks(self.on_change, "Catalog")
         try:
-            with open(self.catalog_file, "w") as f:
-                json.dump(self.catalog, f, indent=2, ensure_ascii=False)
+            started = time.perf_counter()
+            # Atomic replace: other processes reading catalog.json only ever see a whole version
+            atomic_write_json(self.catalog_file, self.catalog, indent=2, ensure_ascii=False, default=dict)
+            self.disk_signature = file_signature(self.catalog_file)
+            self.saves += 1
+            self.save_seconds += time.perf_counter() - started
             return True
         except Exception as e:
             self_heal(f"Catalog save failed: {e}")
             return False
 
+    @contextmanager
+    def batch_updates(self):
+        """Defer catalog saves until the outermost batch exits, then save once"""
+        with self._write_lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if not self._batch_depth and self._dirty:
+                    self._dirty = False
+                    self._save_catalog()
+
     async def generate_product_insight(self, product_name, specs):
         """Use AI to generate intelligent product descriptions"""
         try:
             if not self.ai_engine:
                 return None
-            
+
             prompt = f"Generate a compelling, brief product insight for: {product_name} ({specs}). Keep it 1-2 sentences, professional."
             insight = await self.ai_engine.generate(prompt)
-            
-            self.catalog["ai_insights"].append({
-                "product": product_name,
-                "insight": insight,
-                "timestamp": str(os.times())
-            })
-            self._save_catalog()
+
+            with self._write_lock:
+                catalog = self.catalog
+                self._publish(_with(catalog, {"ai_insights": catalog["ai_insights"] + (freeze({
+                    "product": product_name,
+                    "insight": insight,
+                    "timestamp": str(os.times())
+                }),)}))
             return insight
         except Exception as e:
             self_heal(f"Generate product insight failed: {e}")
@@ -68,8 +193,9 @@ class CatalogManager:
                 "description": description,
                 "products": []
             }
-            self.catalog["sections"].append(section)
-            self._save_catalog()
+            with self._write_lock:
+                catalog = self.catalog
+                self._publish(_with(catalog, {"sections": catalog["sections"] + (freeze(section),)}))
             return True
         except Exception as e:
             self_heal(f"Add section failed: {e}")
@@ -77,78 +203,90 @@ class CatalogManager:
 
     def add_product_to_section(self, section_title, name, specs, price, notes=""):
         try:
-            for section in self.catalog["sections"]:
-                if section["title"] == section_title:
-                    product = {
-                        "name": name,
-                        "specs": specs,
-                        "price": price,
-                        "notes": notes,
-                        "status": "available",
-                        "nft_id": None,  # Will be set when NFT is created
-                        "ai_generated": False
-                    }
-                    section["products"].append(product)
-                    self._save_catalog()
-                    return True
-            return False
+            with self._write_lock:
+                catalog = self.catalog
+                index = _find(catalog["sections"], "title", section_title)
+                if index is None:
+                    return False
+                section = catalog["sections"][index]
+                product = {
+                    "name": name,
+                    "specs": specs,
+                    "price": price,
+                    "notes": notes,
+                    "status": "available",
+                    "nft_id": None,  # Will be set when NFT is created
+                    "ai_generated": False
+                }
+                section = _with(section, {"products": section["products"] + (freeze(product),)})
+                self._publish(_with(catalog, {"sections": _replace_at(catalog["sections"], index, section)}))
+                return True
         except Exception as e:
             self_heal(f"Add product failed: {e}")
             return False
 
-    def register_product_nft(self, section_title, product_name, nft_file):
-        """Register NFT conversion for a product"""
-        try:
-            for section in self.catalog["sections"]:
-                if section["title"] == section_title:
-                    for product in section["products"]:
-                        if product["name"] == product_name:
-                            product["nft_id"] = nft_file
-                            self.catalog["nft_catalog"].append({
-                                "product": product_name,
-                                "nft_file": nft_file,
-                                "section": section_title
-                            })
-                            self._save_catalog()
-                            return True
+    def _update_product(self, section_title, product_name, changes, extra=None):
+        """Publish a version with changes(product) -> {key: value} applied to one product, plus top-level extra keys"""
+        catalog = self.catalog
+        index = _find(catalog["sections"], "title", section_title)
+        if index is None:
+            return False
+        section = catalog["sections"][index]
+        position = _find(section["products"], "name", product_name)
+        if position is None:
             return False
+        product = section["products"][position]
+        product = _with(product, changes(product))
+        section = _with(section, {"products": _replace_at(section["products"], position, product)})
+        self._publish(_with(catalog, {"sections": _replace_at(catalog["sections"], index, section), **(extra or {})}))
+        return True
+
+    def register_product_nft(self, section_title, product_name, nft_file, nft_id=None):
+        """Register NFT conversion for a product; registering the same NFT again changes nothing"""
+        try:
+            with self._write_lock:
+                nft_catalog = self.catalog["nft_catalog"]
+                if any(entry["nft_file"] == nft_file or (nft_id and entry.get("nft_id") == nft_id)
+                       for entry in nft_catalog):
+                    return True
+                entry = {"product": product_name, "nft_file": nft_file, "section": section_title}
+                if nft_id:
+                    entry["nft_id"] = nft_id
+                return self._update_product(section_title, product_name, lambda product: {"nft_id": nft_file}, extra={
+                    "nft_catalog": nft_catalog + (freeze(entry),)
+                })
         except Exception as e:
             self_heal(f"Register NFT failed: {e}")
             return False
 
     def update_product(self, section_title, product_name, **kwargs):
         try:
-            for section in self.catalog["sections"]:
-                if section["title"] == section_title:
-                    for product in section["products"]:
-                        if product["name"] == product_name:
-                            for key, value in kwargs.items():
-                                if key in product:
-                                    product[key] = value
-                            self._save_catalog()
-                            return True
-            return False
+            with self._write_lock:
+                return self._update_product(section_title, product_name, lambda product: {
+                    key: value for key, value in kwargs.items() if key in product
+                })
         except Exception as e:
             self_heal(f"Update product failed: {e}")
             return False
 
     def delete_product(self, section_title, product_name):
         try:
-            for section in self.catalog["sections"]:
-                if section["title"] == section_title:
-                    section["products"] = [p for p in section["products"] if p["name"] != product_name]
-                    self._save_catalog()
-                    return True
-            return False
+            with self._write_lock:
+                catalog = self.catalog
+                index = _find(catalog["sections"], "title", section_title)
+                if index is None:
+                    return False
+                section = catalog["sections"][index]
+                products = tuple(p for p in section["products"] if p["name"] != product_name)
+                section = _with(section, {"products": products})
+                self._publish(_with(catalog, {"sections": _replace_at(catalog["sections"], index, section)}))
+                return True
         except Exception as e:
             self_heal(f"Delete product failed: {e}")
             return False
 
     def get_section(self, title):
-        for section in self.catalog["sections"]:
-            if section["title"] == title:
-                return section
-        return None
+        return self._snapshot.get_section(title)
 
     def get_all_sections(self):
         return self.catalog["sections"]
@@ -163,17 +301,21 @@ class CatalogManager:
 
     def set_brand_info(self, key, value):
         try:
-            self.catalog[key] = value
-            self._save_catalog()
+            with self._write_lock:
+                self._publish(_with(self.catalog, {key: value}))
             return True
         except Exception as e:
             self_heal(f"Set brand info failed: {e}")
             return False
 
+    def _set_info(self, key, value):
+        with self._write_lock:
+            catalog = self.catalog
+            self._publish(_with(catalog, {"info": _with(catalog["info"], {key: value})}))
+
     def set_opening_hours(self, hours):
         try:
-            self.catalog["info"]["opening_hours"] = hours
-            self._save_catalog()
+            self._set_info("opening_hours", hours)
             return True
         except Exception as e:
             self_heal(f"Set hours failed: {e}")
@@ -181,8 +323,7 @@ class CatalogManager:
 
     def set_delivery_info(self, delivery_text):
         try:
-            self.catalog["info"]["delivery"] = delivery_text
-            self._save_catalog()
+            self._set_info("delivery", delivery_text)
             return True
         except Exception as e:
             self_heal(f"Set delivery failed: {e}")
@@ -191,15 +332,16 @@ class CatalogManager:
     def render_menu(self):
         """Generate formatted menu with exact aesthetic"""
         try:
-            menu = f"{self.catalog['brand']}\n"
+            catalog = self.catalog  # one version for the whole render
+            menu = f"{catalog['brand']}\n"
             menu += "━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-            
-            for section in self.catalog["sections"]:
+
+            for section in catalog["sections"]:
                 menu += f"{section['emoji']}  {section['title']}\n"
                 menu += "━━━━━━━━━━━━━━━━━━━━━━━━\n"
                 if section["description"]:
                     menu += f"{section['description']}\n\n"
-                
+
                 for product in section["products"]:
                     menu += f"**{product['name']}**\n"
                     menu += f"{product['specs']}\n"
@@ -207,10 +349,10 @@ class CatalogManager:
                     if product['notes']:
                         menu += f"{product['notes']}\n"
                     menu += "\n"
-            
+
             menu += "━━━━━━━━━━━━━━━━━━━━━━━━\n"
-            menu += f"\n\"{self.catalog['tagline']}\"\n"
-            
+            menu += f"\n\"{catalog['tagline']}\"\n"
+
             return menu
         except Exception as e:
             self_heal(f"Render menu failed: {e}")
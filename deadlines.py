@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+ECOSYSTEM DEADLINES: Time budgets carried by queued jobs
+Set once at enqueue; expired jobs are dropped and in-flight work is cancelled at the deadline.
+"""
+
+import asyncio, time
+
+class DeadlineExceeded(Exception):
+    pass
+
+class Deadline:
+    __slots__ = ("created", "expires")
+
+    def __init__(self, seconds):
+        self.created = time.monotonic()
+        self.expires = self.created + seconds
+
+    def elapsed(self):
+        """Seconds since the job was enqueued"""
+        return time.monotonic() - self.created
+
+    def remaining(self):
+        return max(0.0, self.expires - time.monotonic())
+
+    @property
+    def expired(self):
+        return time.monotonic() >= self.expires
+
+    def check(self):
+        """Cooperative cancellation point for sync work (e.g. renders in a worker thread)"""
+        if self.expired:
+            raise DeadlineExceeded()
+
+    async def run(self, awaitable):
+        """Await with the remaining budget; the awaitable is cancelled when it runs out"""
+        if self.expired:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise DeadlineExceeded()
+        try:
+            return await asyncio.wait_for(awaitable, self.remaining())
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded() from None
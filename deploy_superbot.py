@@ -1,5 +1,11 @@
 #!/usr/bin/env python3
-import shutil, subprocess, logging, os
+"""
+DEPLOYMENT: Incremental sync + cached dependency install
+Only files whose content hash changed are copied; pip runs only when requirements.txt
+(or the interpreter) changed, and then installs from a local wheel cache.
+"""
+
+import hashlib, json, logging, os, shutil, subprocess, sys, time
 from pathlib import Path
 
 logging.basicConfig(level=logging.INFO)
@@ -7,35 +13,127 @@ logging.basicConfig(level=logging.INFO)
 SOURCE_DIR = Path(".")
 DEPLOY_DIR = Path("/opt/render/project/src/superbot")
 REQUIREMENTS_FILE = SOURCE_DIR / "requirements.txt"
+MANIFEST_FILE = DEPLOY_DIR / ".deploy_manifest.json"       # relpath -> [size, mtime_ns, sha256]
+REQUIREMENTS_STAMP = DEPLOY_DIR / ".requirements.sha256"
+WHEEL_CACHE = Path(os.getenv("DEPLOY_WHEEL_CACHE", str(DEPLOY_DIR.parent / ".wheelhouse")))
+EXCLUDED_DIRS = {".git", "__pycache__"}
+EXCLUDED_FILES = {MANIFEST_FILE.name, REQUIREMENTS_STAMP.name}
 
 def self_heal(msg):
     logging.warning(f"[SELF-HEAL] {msg}")
 
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest():
+    try:
+        with open(MANIFEST_FILE) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        self_heal(f"Manifest unreadable, doing a full sync: {e}")
+        return {}
+
+def write_json_atomic(path, data):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+def scan_source(previous):
+    """relpath -> [size, mtime_ns, sha256]; files whose size and mtime are unchanged are not re-read"""
+    entries = {}
+    # The deploy dir and wheel cache may sit inside the checkout
+    skip = {DEPLOY_DIR.resolve(), WHEEL_CACHE.resolve()}
+    for root, dirs, files in os.walk(SOURCE_DIR):
+        dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS and (Path(root) / d).resolve() not in skip]
+        for name in files:
+            if name in EXCLUDED_FILES or name.endswith(".pyc"):
+                continue
+            path = Path(root) / name
+            rel = path.relative_to(SOURCE_DIR).as_posix()
+            stat = path.stat()
+            known = previous.get(rel)
+            if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+                entries[rel] = known
+            else:
+                entries[rel] = [stat.st_size, stat.st_mtime_ns, file_hash(path)]
+    return entries
+
 def copy_files():
+    """Copy changed files, delete files removed from the source; runtime state in DEPLOY_DIR is left alone"""
     try:
-        if DEPLOY_DIR.exists():
-            shutil.rmtree(DEPLOY_DIR)
-        shutil.copytree(SOURCE_DIR, DEPLOY_DIR)
-        logging.info("[SELF-HEAL] Files copied to Render deployment folder")
+        started = time.perf_counter()
+        DEPLOY_DIR.mkdir(parents=True, exist_ok=True)
+        previous = load_manifest()
+        current = scan_source(previous)
+        changed = [rel for rel, entry in current.items()
+                   if rel not in previous or previous[rel][2] != entry[2] or not (DEPLOY_DIR / rel).exists()]
+        removed = [rel for rel in previous if rel not in current]
+
+        for rel in changed:
+            target = DEPLOY_DIR / rel
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = target.with_name(target.name + ".deploy-tmp")
+            shutil.copy2(SOURCE_DIR / rel, tmp_path)
+            os.replace(tmp_path, target)   # a running reader never sees a half-written file
+        for rel in removed:
+            # Only files this script deployed: data the bot wrote itself is never in the manifest
+            try:
+                (DEPLOY_DIR / rel).unlink()
+            except FileNotFoundError:
+                pass
+
+        write_json_atomic(MANIFEST_FILE, current)
+        logging.info(
+            f"[SELF-HEAL] Synced {len(changed)} changed, {len(removed)} removed, "
+            f"{len(current) - len(changed)} unchanged files in {time.perf_counter() - started:.2f}s"
+        )
     except Exception as e:
         self_heal(f"Copy failed: {e}")
 
+def requirements_hash():
+    """Pins + interpreter: a Python upgrade needs fresh wheels even with the same requirements"""
+    digest = hashlib.sha256(REQUIREMENTS_FILE.read_bytes())
+    digest.update(f"{sys.implementation.cache_tag}|{sys.platform}".encode())
+    return digest.hexdigest()
+
+def pip(*args):
+    subprocess.run([sys.executable, "-m", "pip", *args], check=True)
+
 def install_requirements():
     try:
-        subprocess.run(["pip", "install", "-r", str(REQUIREMENTS_FILE)], check=True)
+        started = time.perf_counter()
+        wanted = requirements_hash()
+        if REQUIREMENTS_STAMP.exists() and REQUIREMENTS_STAMP.read_text().strip() == wanted:
+            logging.info("[SELF-HEAL] requirements.txt unchanged, skipping install")
+            return
+        WHEEL_CACHE.mkdir(parents=True, exist_ok=True)
+        try:
+            # Only wheels missing from the cache are downloaded/built; the install itself is offline
+            pip("wheel", "-r", str(REQUIREMENTS_FILE), "-w", str(WHEEL_CACHE), "--find-links", str(WHEEL_CACHE))
+            pip("install", "--no-index", "--find-links", str(WHEEL_CACHE), "-r", str(REQUIREMENTS_FILE))
+        except subprocess.CalledProcessError as e:
+            self_heal(f"Wheel cache install failed, installing from the index: {e}")
+            pip("install", "-r", str(REQUIREMENTS_FILE))
+        REQUIREMENTS_STAMP.write_text(wanted)
+        logging.info(f"[SELF-HEAL] Requirements installed in {time.perf_counter() - started:.1f}s")
     except Exception as e:
-        self_heal(f"Initial install failed: {e}")
-        subprocess.run(["pip", "install", "Pillow>=10.2.0"], check=True)
-        subprocess.run(["pip", "install", "-r", str(REQUIREMENTS_FILE)], check=True)
+        self_heal(f"Requirements install failed: {e}")
 
 def start_bot():
     try:
-        subprocess.run(["python", str(DEPLOY_DIR / "bot.py")], check=True)
+        subprocess.run([sys.executable, str(DEPLOY_DIR / "bot.py")], check=True)
     except Exception as e:
         self_heal(f"Bot failed to start: {e}")
 
 def main():
-    logging.info("[SELF-HEAL] Starting full deployment")
+    logging.info("[SELF-HEAL] Starting incremental deployment")
     copy_files()
     install_requirements()
     start_bot()
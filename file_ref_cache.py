@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+ECOSYSTEM TELEGRAM FILE CACHE: Reuse uploaded media instead of re-sending bytes
+Maps asset sha256 -> media reference of the first upload, persisted next to the NFT registry.
+"""
+
+import base64, hashlib, os
+from telethon.tl import types
+from telethon.errors import (
+    FileReferenceExpiredError, FileReferenceInvalidError, FileIdInvalidError,
+    MediaEmptyError, MediaInvalidError
+)
+from journal import Journal
+from self_heal import self_heal
+
+FILE_REF_COMPACT_EVERY = int(os.getenv("FILE_REF_COMPACT_EVERY", 1000))
+
+# Errors meaning the cached reference is no longer usable - fall back to uploading
+STALE_REFERENCE_ERRORS = (
+    FileReferenceExpiredError, FileReferenceInvalidError, FileIdInvalidError,
+    MediaEmptyError, MediaInvalidError
+)
+
+def hash_file(path):
+    """sha256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def pack_media_ref(media):
+    """JSON-safe reference to an uploaded photo/document, or None"""
+    if isinstance(media, types.MessageMediaPhoto):
+        kind, item = "photo", media.photo
+    elif isinstance(media, types.MessageMediaDocument):
+        kind, item = "document", media.document
+    else:
+        return None
+    if item is None or not hasattr(item, "access_hash"):
+        return None
+    return {
+        "kind": kind,
+        "id": item.id,
+        "access_hash": item.access_hash,
+        "file_reference": base64.b64encode(item.file_reference).decode()
+    }
+
+def unpack_media_ref(ref):
+    """InputPhoto/InputDocument that Telethon accepts as file="""
+    input_type = types.InputPhoto if ref["kind"] == "photo" else types.InputDocument
+    return input_type(
+        id=ref["id"],
+        access_hash=ref["access_hash"],
+        file_reference=base64.b64decode(ref["file_reference"])
+    )
+
+class FileRefCache:
+    def __init__(self, cache_dir="nft_assets", autoload=True):
+        self.journal = Journal(
+            f"{cache_dir}/file_refs.json",
+            f"{cache_dir}/file_refs.log",
+            compact_every=FILE_REF_COMPACT_EVERY
+        )
+        self.refs = self._load() if autoload else {}
+        self.hits = 0
+        self.misses = 0
+
+    def load(self):
+        """Load the cached refs when the cache was built with autoload=False"""
+        self.refs = self._load()
+        return self
+
+    def _load(self):
+        try:
+            refs, ops = self.journal.load({})
+            for op in ops:
+                if op["ref"] is None:
+                    refs.pop(op["hash"], None)
+                else:
+                    refs[op["hash"]] = op["ref"]
+            return refs
+        except Exception as e:
+            self_heal(f"File ref cache load failed: {e}")
+            return {}
+
+    def _record(self, asset_hash, ref):
+        self.journal.append({"hash": asset_hash, "ref": ref})
+        if self.journal.should_compact():
+            self.journal.compact(self.refs)
+
+    def get(self, asset_hash):
+        return self.refs.get(asset_hash)
+
+    def put(self, asset_hash, ref):
+        if self.refs.get(asset_hash) == ref:
+            return
+        self.refs[asset_hash] = ref
+        self._record(asset_hash, ref)
+
+    def invalidate(self, asset_hash):
+        if self.refs.pop(asset_hash, None) is not None:
+            self._record(asset_hash, None)
+
+    async def send_file(self, event, path, asset_hash=None, **kwargs):
+        """Respond with a file, reusing the Telegram reference when this asset was sent before"""
+        asset_hash = asset_hash or hash_file(path)
+        ref = self.refs.get(asset_hash)
+        if ref:
+            try:
+                message = await event.respond(file=unpack_media_ref(ref), **kwargs)
+                self.hits += 1
+                return message
+            except STALE_REFERENCE_ERRORS as e:
+                self_heal(f"Cached file ref rejected, re-uploading: {e}")
+                self.invalidate(asset_hash)
+
+        self.misses += 1
+        message = await event.respond(file=path, **kwargs)
+        try:
+            ref = pack_media_ref(getattr(message, "media", None))
+            if ref:
+                self.put(asset_hash, ref)
+        except Exception as e:
+            self_heal(f"File ref cache store failed: {e}")
+        return message
@@ -1,11 +1,81 @@
-from flask import Flask
+#!/usr/bin/env python3
+"""
+ECOSYSTEM HEARTBEAT: Health + metrics HTTP endpoint on the bot's own event loop
+GET /         -> "Bot online" (Render health check)
+GET /healthz  -> liveness: answered at all means the loop is turning
+GET /readyz   -> readiness: 200 when every registered check passes, else 503
+GET /metrics  -> Prometheus text format
+"""
+
+import asyncio, os
 from self_heal import self_heal
 
-app = Flask(__name__)
+HEARTBEAT_HOST = os.getenv("HEARTBEAT_HOST", "0.0.0.0")
+HEARTBEAT_PORT = int(os.getenv("PORT", 10000))
+REQUEST_TIMEOUT = 5.0
+MAX_HEADER_LINES = 100
+
+STATUS_TEXT = {200: "OK", 404: "Not Found", 405: "Method Not Allowed", 503: "Service Unavailable"}
+
+def _response(status, body, content_type="text/plain; charset=utf-8"):
+    payload = body.encode()
+    head = (
+        f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        "Connection: close\r\n\r\n"
+    )
+    return head.encode() + payload
+
+class Heartbeat:
+    def __init__(self, metrics, host=HEARTBEAT_HOST, port=HEARTBEAT_PORT):
+        self.metrics = metrics   # MetricsRegistry: /metrics + readiness checks
+        self.host = host
+        self.port = port
+        self.requests = 0
+        metrics.counter("heartbeat_requests_total", "HTTP requests served by the heartbeat", lambda: self.requests)
+
+    async def serve(self):
+        try:
+            server = await asyncio.start_server(self._handle, self.host, self.port)
+            async with server:
+                await server.serve_forever()
+        except Exception as e:
+            self_heal(f"Heartbeat crashed: {e}")
 
-@app.route("/")
-def alive(): return "Bot online", 200
+    def _route(self, method, path):
+        if method != "GET":
+            return _response(405, "Method not allowed\n")
+        path = path.split("?", 1)[0]
+        if path == "/":
+            return _response(200, "Bot online")
+        if path == "/healthz":
+            return _response(200, "ok\n")
+        if path == "/readyz":
+            ready, checks = self.metrics.readiness()
+            body = "".join(f"{name}: {'ok' if ok else 'failing'}\n" for name, ok in checks.items())
+            return _response(200 if ready else 503, body or "ok\n")
+        if path == "/metrics":
+            return _response(200, self.metrics.render(), "text/plain; version=0.0.4; charset=utf-8")
+        return _response(404, "Not found\n")
 
-def run_flask():
-    try: app.run(host="0.0.0.0", port=10000)
-    except Exception as e: self_heal(f"Heartbeat crashed: {e}")
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)
+            # Headers are not needed; drain them so the client sees a clean response
+            for _ in range(MAX_HEADER_LINES):
+                line = await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+            parts = request_line.decode("latin-1").split()
+            if len(parts) < 2:
+                return
+            self.requests += 1
+            writer.write(self._route(parts[0], parts[1]))
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        except Exception as e:
+            self_heal(f"Heartbeat request failed: {e}")
+        finally:
+            writer.close()
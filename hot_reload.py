@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+ECOSYSTEM HOT RELOAD: Pick up external edits to data and config files without a restart
+Files are polled by stat signature; a changed file is parsed in a worker thread and the
+result is swapped in on the loop in one step, so handlers see either the old or the new state.
+"""
+
+import asyncio, os
+from collections import Counter
+from journal import file_signature
+from self_heal import self_heal
+
+HOT_RELOAD_INTERVAL = float(os.getenv("HOT_RELOAD_INTERVAL", 2.0))
+
+class WatchedFile:
+    __slots__ = ("name", "path", "load", "apply", "owner_signature", "signature")
+
+    def __init__(self, name, path, load, apply, owner_signature):
+        self.name = name
+        self.path = path
+        self.load = load                        # path -> value, runs in a worker thread
+        self.apply = apply                      # value -> None, runs on the loop
+        self.owner_signature = owner_signature  # signature of the owner's own last write, or None
+        self.signature = file_signature(path)
+
+class HotReloader:
+    def __init__(self, interval=HOT_RELOAD_INTERVAL):
+        self.interval = interval
+        self.watched = []
+        self.reloads = Counter()    # name -> swaps applied
+        self.failures = Counter()   # name -> loads/applies that failed (old state kept)
+
+    def watch(self, name, path, load, apply, owner_signature=None):
+        """
+        load(path) must not touch live state. owner_signature() returns the signature of
+        the owner's own last write: those changes are not external edits and are skipped.
+        """
+        self.watched.append(WatchedFile(name, path, load, apply, owner_signature))
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            signatures = await asyncio.to_thread(lambda: [file_signature(w.path) for w in self.watched])
+            for watched, signature in zip(self.watched, signatures):
+                if signature is None or signature == watched.signature:
+                    continue
+                watched.signature = signature   # a broken file is retried only after it changes again
+                await self._reload(watched, signature)
+
+    async def _reload(self, watched, signature):
+        owner = watched.owner_signature
+        if owner is not None and owner() == signature:
+            return
+        before = owner() if owner is not None else None
+        try:
+            value = await asyncio.to_thread(watched.load, watched.path)
+        except Exception as e:
+            self.failures[watched.name] += 1
+            self_heal(f"Hot reload of {watched.name} failed, keeping current state: {e}")
+            return
+        if owner is not None and owner() != before:
+            return  # the owner saved while we were parsing: its write is newer than what we read
+        try:
+            watched.apply(value)
+            self.reloads[watched.name] += 1
+        except Exception as e:
+            self.failures[watched.name] += 1
+            self_heal(f"Hot reload of {watched.name} could not be applied: {e}")
+
+    def register(self, registry):
+        registry.counter("hot_reloads_total", "External file changes swapped in", lambda: [
+            ({"source": w.name}, self.reloads[w.name]) for w in self.watched
+        ])
+        registry.counter("hot_reload_failures_total", "External file changes rejected", lambda: [
+            ({"source": w.name}, self.failures[w.name]) for w in self.watched
+        ])
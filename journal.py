@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+ECOSYSTEM PERSISTENCE: Append-only operation journal with snapshot compaction
+Every update costs one small append. Startup loads the snapshot and replays the tail.
+"""
+
+import json, os, time
+from self_heal import self_heal
+
+def atomic_write_json(path, data, **dump_kwargs):
+    """Write JSON to a temp file and rename it over the target"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, **dump_kwargs)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def file_signature(path):
+    """(mtime_ns, size, inode), or None when missing: changes on every write and every atomic replace"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+class Journal:
+    """
+    Snapshot file + JSON-lines operation log.
+
+    snapshot: {"seq": <last applied op seq>, "data": <state>}
+    log:      one {"seq": n, "op": {...}} object per line
+    Ops with seq <= snapshot seq are skipped on replay, so a crash between
+    writing the snapshot and truncating the log never applies an op twice.
+    """
+
+    def __init__(self, snapshot_file, log_file=None, compact_every=1000):
+        self.snapshot_file = snapshot_file
+        self.log_file = log_file or f"{os.path.splitext(snapshot_file)[0]}.log"
+        self.compact_every = compact_every
+        self.seq = 0
+        self.ops_since_snapshot = 0
+        self._log = None
+        # Flush timings, read by the metrics endpoint
+        self.appends = 0
+        self.append_seconds = 0.0
+        self.compactions = 0
+        self.compact_seconds = 0.0
+
+    def load(self, default):
+        """Return (state, ops) - the snapshot state and the log tail to replay"""
+        state = default
+        try:
+            if os.path.exists(self.snapshot_file):
+                with open(self.snapshot_file, "r") as f:
+                    snapshot = json.load(f)
+                if isinstance(snapshot, dict) and "seq" in snapshot and "data" in snapshot:
+                    self.seq = snapshot["seq"]
+                    state = snapshot["data"]
+                else:
+                    # Legacy plain-JSON file: treat it as a snapshot at seq 0
+                    state = snapshot
+        except Exception as e:
+            self_heal(f"Journal snapshot load failed ({self.snapshot_file}): {e}")
+
+        ops = []
+        try:
+            if os.path.exists(self.log_file):
+                good_end = 0  # byte offset just past the last complete, parseable line
+                with open(self.log_file, "rb") as f:
+                    for line in f:
+                        try:
+                            if not line.endswith(b"\n"):
+                                raise ValueError("unterminated line")
+                            entry = json.loads(line)
+                        except ValueError:
+                            # Torn write at the tail after a crash
+                            break
+                        good_end += len(line)
+                        if entry["seq"] > self.seq:
+                            ops.append(entry["op"])
+                            self.seq = entry["seq"]
+                    torn = f.seek(0, os.SEEK_END) > good_end
+                if torn:
+                    # Cut the fragment off, or the next append would be glued onto it and lost on replay
+                    self._truncate_log(good_end)
+        except Exception as e:
+            self_heal(f"Journal replay failed ({self.log_file}): {e}")
+
+        self.ops_since_snapshot = len(ops)
+        return state, ops
+
+    def _truncate_log(self, size):
+        self_heal(f"Journal log truncated to its last complete op ({self.log_file}, {size} bytes)")
+        with open(self.log_file, "r+b") as f:
+            f.truncate(size)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _open_log(self):
+        if self._log is None:
+            directory = os.path.dirname(self.log_file)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            self._log = open(self.log_file, "a")
+        return self._log
+
+    def append(self, op):
+        """Append one op to the log"""
+        return self.append_many([op])
+
+    def append_many(self, ops):
+        """Append several ops with a single write + flush; on failure nothing is kept and seq is unchanged"""
+        seq = self.seq
+        position = None
+        try:
+            lines = []
+            for op in ops:
+                seq += 1
+                lines.append(json.dumps({"seq": seq, "op": op}, separators=(",", ":")))
+            if not lines:
+                return True
+            started = time.perf_counter()
+            log = self._open_log()
+            position = os.fstat(log.fileno()).st_size  # the buffer is empty: every append is flushed
+            log.write("\n".join(lines) + "\n")
+            log.flush()
+            self.seq = seq
+            self.appends += 1
+            self.append_seconds += time.perf_counter() - started
+            self.ops_since_snapshot += len(lines)
+            return True
+        except Exception as e:
+            self_heal(f"Journal append failed ({self.log_file}): {e}")
+            self._discard_partial_write(position)
+            return False
+
+    def _discard_partial_write(self, position):
+        """Drop whatever part of a failed append reached the file, so later appends start on a clean line"""
+        if self._log is None:
+            return
+        try:
+            self._log.close()
+        except Exception:
+            pass  # closing flushes the buffer, which may fail the same way the write did
+        self._log = None
+        if position is None:
+            return
+        try:
+            self._truncate_log(position)
+        except Exception as e:
+            self_heal(f"Journal could not drop a partial append ({self.log_file}): {e}")
+
+    def should_compact(self):
+        return self.ops_since_snapshot >= self.compact_every
+
+    def compact(self, state):
+        """Write a full snapshot of state and truncate the log"""
+        try:
+            started = time.perf_counter()
+            atomic_write_json(self.snapshot_file, {"seq": self.seq, "data": state})
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            open(self.log_file, "w").close()
+            self.ops_since_snapshot = 0
+            self.compactions += 1
+            self.compact_seconds += time.perf_counter() - started
+            return True
+        except Exception as e:
+            self_heal(f"Journal compaction failed ({self.snapshot_file}): {e}")
+            return False
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+ECOSYSTEM LOGGING: Non-blocking structured log pipeline
+Callers only enqueue; a background listener thread formats JSON lines and writes them.
+Repeated self_heal messages are collapsed into one line plus a suppressed-count summary.
+"""
+
+import atexit, json, logging, os, queue, sys, threading, time
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+LOG_DEDUP_WINDOW = float(os.getenv("LOG_DEDUP_WINDOW", 60))   # seconds a repeated message stays quiet
+LOG_DEDUP_KEYS = 1024                                          # distinct messages tracked at once
+STRUCTURED_FIELDS = ("event", "repeats", "window")
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            if hasattr(record, field):
+                entry[field] = getattr(record, field)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+JsonFormatter.converter = time.gmtime
+
+class DroppingQueueHandler(QueueHandler):
+    """Never blocks the caller: when the writer falls behind, records are dropped and counted"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Resolve the message now (args may mutate later); keep exc as text for the writer
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+_listener = None
+_handler = None
+
+def dropped_records():
+    """Records dropped by the queue handler so far (0 before setup_logging)"""
+    return _handler.dropped if _handler is not None else 0
+
+def setup_logging(level=LOG_LEVEL, stream=None):
+    """Route the root logger through the queue; idempotent. Returns the queue handler."""
+    global _listener, _handler
+    if _handler is not None:
+        return _handler
+    writer = logging.StreamHandler(stream or sys.stderr)
+    writer.setFormatter(JsonFormatter())
+    _handler = DroppingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+    _listener = QueueListener(_handler.queue, writer, respect_handler_level=True)
+    _listener.start()
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(_handler)
+    root.setLevel(level)
+    atexit.register(shutdown_logging)
+    return _handler
+
+def shutdown_logging():
+    """Flush queued records (listener drains before stopping)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+class StormSuppressor:
+    """
+    First occurrence of a message is logged; repeats within the window are only counted.
+    When the window ends the count is logged as one summary line: by the next log() call,
+    or by the sweeper thread (start()) when the storm simply stops.
+    """
+
+    def __init__(self, logger, window=LOG_DEDUP_WINDOW, max_keys=LOG_DEDUP_KEYS):
+        self.logger = logger
+        self.window = window
+        self.max_keys = max_keys
+        self.suppressed = 0
+        self._seen = {}            # message -> [window start, repeats, level, event]
+        self._next_sweep = 0.0
+        self._lock = threading.Lock()
+        self._sweeper = None
+        self._stopping = threading.Event()
+
+    def log(self, level, msg, event=None):
+        now = time.monotonic()
+        summaries = []
+        with self._lock:
+            if now >= self._next_sweep:
+                summaries = self._sweep(now)
+            entry = self._seen.get(msg)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                self.suppressed += 1
+                emit = False
+            else:
+                if entry is not None and entry[1]:
+                    summaries.append((msg, *entry[1:]))
+                if entry is not None or len(self._seen) < self.max_keys:
+                    self._seen[msg] = [now, 0, level, event]
+                emit = True
+        for summary in summaries:
+            self._summary(*summary)
+        if emit:
+            self.logger.log(level, msg, extra={"event": event} if event else None)
+
+    def start(self, interval=1.0):
+        """Sweep expired windows every interval seconds in a daemon thread; idempotent"""
+        if self._sweeper is not None:
+            return
+        self._stopping.clear()
+        self._sweeper = threading.Thread(target=self._sweep_loop, args=(interval,), name="log-storm-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop(self):
+        """Stop the sweeper and log every pending summary (shutdown)"""
+        if self._sweeper is not None:
+            self._stopping.set()
+            self._sweeper.join()
+            self._sweeper = None
+        self.flush()
+
+    def _sweep_loop(self, interval):
+        while not self._stopping.wait(interval):
+            with self._lock:
+                summaries = self._sweep(time.monotonic())
+            for summary in summaries:
+                self._summary(*summary)
+
+    def flush(self):
+        """Log summaries for every message still being suppressed (shutdown)"""
+        with self._lock:
+            pending = [(msg, *entry[1:]) for msg, entry in self._seen.items() if entry[1]]
+            self._seen.clear()
+        for summary in pending:
+            self._summary(*summary)
+
+    def _sweep(self, now):
+        """Drop expired entries, returning summaries for those that were suppressed"""
+        self._next_sweep = now + min(self.window, 1.0)
+        summaries = []
+        for msg, entry in list(self._seen.items()):
+            if now - entry[0] >= self.window:
+                del self._seen[msg]
+                if entry[1]:
+                    summaries.append((msg, *entry[1:]))
+        return summaries
+
+    def _summary(self, msg, repeats, level, event):
+        extra = {"repeats": repeats, "window": self.window}
+        if event:
+            extra["event"] = event
+        self.logger.log(level, f"{msg} (repeated {repeats} more times in {self.window:g}s)", extra=extra)
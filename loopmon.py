@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+ECOSYSTEM LOOP MONITOR: Event-loop lag + slow callback detection
+A tick task measures how late the loop wakes it; a watchdog thread samples the loop
+thread's stack while the loop is stuck, so every stall is reported with its culprit.
+"""
+
+import asyncio, os, sys, threading, time, traceback
+from collections import deque
+from metrics import Histogram
+from self_heal import self_heal
+
+LOOP_TICK_INTERVAL = float(os.getenv("LOOP_TICK_INTERVAL", 0.1))
+LOOP_SLOW_CALLBACK = float(os.getenv("LOOP_SLOW_CALLBACK", 0.1))   # seconds blocked => flagged
+LOOP_READY_LAG = float(os.getenv("LOOP_READY_LAG", 1.0))           # stall that fails readiness
+LOOP_READY_WINDOW = float(os.getenv("LOOP_READY_WINDOW", 30.0))    # ...for this long afterwards
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+class SlowCallback:
+    __slots__ = ("started", "duration", "handler", "stack")
+
+    def __init__(self, started, handler, stack):
+        self.started = started      # wall clock
+        self.duration = None        # filled in when the loop recovers
+        self.handler = handler      # "file:line in function" of the innermost project frame
+        self.stack = stack          # formatted stack of the loop thread at detection
+
+def _culprit(frames):
+    """Innermost frame from our own code; library frames are rarely the fix"""
+    for frame in reversed(frames):
+        path = os.path.abspath(frame.filename)
+        if path.startswith(PROJECT_DIR) and path != os.path.abspath(__file__):
+            return f"{os.path.basename(frame.filename)}:{frame.lineno} in {frame.name}"
+    if frames:
+        frame = frames[-1]
+        return f"{os.path.basename(frame.filename)}:{frame.lineno} in {frame.name}"
+    return "unknown"
+
+class LoopMonitor:
+    def __init__(self, interval=LOOP_TICK_INTERVAL, slow_threshold=LOOP_SLOW_CALLBACK,
+                 ready_lag=LOOP_READY_LAG, ready_window=LOOP_READY_WINDOW, keep=20):
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self.ready_lag = ready_lag
+        self.ready_window = ready_window
+        self.lag = Histogram(LAG_BUCKETS)
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.slow_callbacks = 0
+        self.recent = deque(maxlen=keep)   # SlowCallback, newest last
+        self._beat = None                  # monotonic time of the last tick
+        self._last_bad = None              # monotonic time of the last readiness-failing stall
+        self._loop_thread = None
+        self._stop = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Loop side
+    # ------------------------------------------------------------------
+
+    async def run(self):
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        threading.Thread(target=self._watchdog, name="loop-watchdog", daemon=True).start()
+        try:
+            while True:
+                expected = time.monotonic() + self.interval
+                await asyncio.sleep(self.interval)
+                now = time.monotonic()
+                lag = max(0.0, now - expected)
+                self._beat = now
+                self.last_lag = lag
+                self.max_lag = max(self.max_lag, lag)
+                self.lag.observe(lag)
+                if lag >= self.ready_lag:
+                    self._last_bad = now
+        finally:
+            self._stop.set()
+
+    def healthy(self):
+        """Readiness: no stall of ready_lag or more within the last ready_window seconds"""
+        if self._beat is None:
+            return False
+        if self._last_bad is not None and time.monotonic() - self._last_bad < self.ready_window:
+            return False
+        return True
+
+    def register(self, registry):
+        registry.histogram("event_loop_lag_seconds", "How late the event loop ran a due timer", lambda: [
+            ({}, self.lag)
+        ])
+        registry.gauge("event_loop_lag_max_seconds", "Largest event loop lag seen", lambda: self.max_lag)
+        registry.counter("event_loop_slow_callbacks_total", "Loop stalls over the slow-callback threshold",
+                         lambda: self.slow_callbacks)
+        registry.check("event_loop", self.healthy)
+
+    # ------------------------------------------------------------------
+    # Watchdog thread
+    # ------------------------------------------------------------------
+
+    def _watchdog(self):
+        poll = min(self.interval, self.slow_threshold) / 2
+        stalled_beat = None
+        current = None
+        while not self._stop.wait(poll):
+            beat = self._beat
+            if stalled_beat is not None and beat != stalled_beat:
+                # Loop recovered: close out the stall
+                current.duration = beat - stalled_beat - self.interval
+                self._last_bad = beat if current.duration >= self.ready_lag else self._last_bad
+                self_heal(
+                    f"Event loop blocked {current.duration:.3f}s in {current.handler}\n{current.stack}"
+                )
+                stalled_beat = current = None
+            if stalled_beat is None and time.monotonic() - beat > self.interval + self.slow_threshold:
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is None:
+                    continue
+                frames = traceback.extract_stack(frame)
+                current = SlowCallback(time.time(), _culprit(frames), "".join(traceback.format_list(frames[-8:])))
+                stalled_beat = beat
+                self.slow_callbacks += 1
+                self.recent.append(current)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+ECOSYSTEM MEDIA INGEST: Download Telegram media into a bounded buffer
+Small files stay in memory, large ones spill to a managed spool dir; nothing is left on disk.
+"""
+
+import os, tempfile
+
+MAX_MEDIA_BYTES = int(os.getenv("MAX_MEDIA_BYTES", 20 * 1024 * 1024))
+MEDIA_SPOOL_THRESHOLD = int(os.getenv("MEDIA_SPOOL_THRESHOLD", 8 * 1024 * 1024))
+MEDIA_SPOOL_DIR = os.getenv("MEDIA_SPOOL_DIR", "media_spool")
+
+class MediaTooLarge(Exception):
+    def __init__(self, size, limit):
+        self.size = size
+        self.limit = limit
+        super().__init__(f"Media is {size} bytes, limit is {limit}")
+
+def declared_size(message):
+    """Size Telegram reports for the message media, if known"""
+    try:
+        return message.file.size if message.file else None
+    except Exception:
+        return None
+
+async def ingest_media(message, max_bytes=MAX_MEDIA_BYTES,
+                       spool_threshold=MEDIA_SPOOL_THRESHOLD, spool_dir=MEDIA_SPOOL_DIR):
+    """
+    Download message media into a SpooledTemporaryFile positioned at 0.
+
+    Raises MediaTooLarge before downloading when the declared size is over the
+    limit, and aborts mid-download if more bytes than that arrive anyway.
+    The caller owns the buffer and must close() it; spooled files are
+    anonymous temp files, so closing also frees the disk space.
+    """
+    size = declared_size(message)
+    if size and size > max_bytes:
+        raise MediaTooLarge(size, max_bytes)
+
+    if not os.path.exists(spool_dir):
+        os.makedirs(spool_dir, exist_ok=True)
+    buffer = tempfile.SpooledTemporaryFile(max_size=spool_threshold, dir=spool_dir)
+
+    def enforce_limit(received, total):
+        if received > max_bytes:
+            raise MediaTooLarge(received, max_bytes)
+
+    try:
+        await message.download_media(file=buffer, progress_callback=enforce_limit)
+        if buffer.tell() > max_bytes:
+            raise MediaTooLarge(buffer.tell(), max_bytes)
+        buffer.seek(0)
+        return buffer
+    except Exception:
+        buffer.close()
+        raise
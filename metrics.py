@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+ECOSYSTEM METRICS: Pull-based registry rendered in Prometheus text format
+Layers keep their own plain counters; collectors read them only when /metrics is scraped.
+"""
+
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from self_heal import self_heal
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+# Seconds; fixed so observe() is one bisect + one increment
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _format_value(value):
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def quantile(self, q):
+        """Estimate by linear interpolation inside the bucket holding the q-th observation"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]  # beyond the last bound: report the bound
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+    def cumulative(self):
+        """[(upper bound, observations <= bound)] including +Inf, as Prometheus expects"""
+        running = 0
+        result = []
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), self.counts):
+            running += bucket_count
+            result.append((bound, running))
+        return result
+
+class HistogramFamily:
+    """One Histogram per label value, created on first use"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.histograms = {}
+
+    def labels(self, key):
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(self.buckets)
+        return histogram
+
+    def items(self):
+        return self.histograms.items()
+
+class CommandStats:
+    """Per-command latency/errors/in-flight plus stage timings inside queued jobs"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.latency = HistogramFamily(buckets)  # command -> Histogram
+        self.errors = Counter()                  # command -> exceptions escaping the handler
+        self.in_flight = Counter()               # command -> handlers currently running
+        self.stages = HistogramFamily(buckets)   # (job, stage) -> Histogram
+
+    @contextmanager
+    def command(self, name):
+        self.in_flight[name] += 1
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.errors[name] += 1
+            raise
+        finally:
+            self.in_flight[name] -= 1
+            self.latency.labels(name).observe(time.perf_counter() - started)
+
+    def stage(self, job, stage):
+        """Context manager timing one stage of a job, e.g. stage("nft", "render")"""
+        return self.stages.labels((job, stage)).time()
+
+    def observe_stage(self, job, stage, seconds):
+        self.stages.labels((job, stage)).observe(seconds)
+
+    def register(self, registry):
+        registry.histogram("command_latency_seconds", "Handler latency per command", lambda: [
+            ({"command": command}, histogram) for command, histogram in self.latency.items()
+        ])
+        registry.counter("command_errors_total", "Exceptions escaping command handlers", lambda: [
+            ({"command": command}, count) for command, count in self.errors.items()
+        ])
+        registry.gauge("command_in_flight", "Command handlers currently running", lambda: [
+            ({"command": command}, count) for command, count in self.in_flight.items()
+        ])
+        registry.histogram("job_stage_seconds", "Time per stage inside queued jobs", lambda: [
+            ({"job": job, "stage": stage}, histogram) for (job, stage), histogram in self.stages.items()
+        ])
+
+class MetricsRegistry:
+    def __init__(self, prefix="ntrli"):
+        self.prefix = prefix
+        self._metrics = []   # (name, type, help, collect)
+        self._checks = {}    # readiness check name -> fn() -> bool
+
+    def _add(self, kind, name, help_text, collect):
+        self._metrics.append((f"{self.prefix}_{name}", kind, help_text, collect))
+
+    def counter(self, name, help_text, collect):
+        """collect() -> number, or [(labels dict, number), ...]"""
+        self._add(COUNTER, name, help_text, collect)
+
+    def gauge(self, name, help_text, collect):
+        self._add(GAUGE, name, help_text, collect)
+
+    def histogram(self, name, help_text, collect):
+        """collect() -> [(labels dict, Histogram), ...]"""
+        self._add(HISTOGRAM, name, help_text, collect)
+
+    def check(self, name, fn):
+        """Register a readiness check; fn() -> truthy when healthy"""
+        self._checks[name] = fn
+
+    def readiness(self):
+        """(ready, {check: ok}); a failing or raising check makes the service not ready"""
+        results = {}
+        for name, fn in self._checks.items():
+            try:
+                results[name] = bool(fn())
+            except Exception as e:
+                self_heal(f"Readiness check {name} failed: {e}")
+                results[name] = False
+        return all(results.values()), results
+
+    def render(self):
+        lines = []
+        for name, kind, help_text, collect in self._metrics:
+            try:
+                samples = collect()
+            except Exception as e:
+                self_heal(f"Metric {name} collection failed: {e}")
+                continue
+            if not isinstance(samples, list):
+                samples = [({}, samples)]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == HISTOGRAM:
+                for labels, histogram in samples:
+                    for bound, count in histogram.cumulative():
+                        le = "+Inf" if bound == float("inf") else _format_value(bound)
+                        lines.append(f"{name}_bucket{_format_labels({**labels, 'le': le})} {count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+                continue
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+ECOSYSTEM AI BACKEND: Mistral chat-completions client
+POST {"model", "messages"} to /v1/chat/completions; the reply is choices[0].message.content.
+Self-hosted servers speaking the same API (vLLM, llama.cpp) work via MISTRAL_API_URL.
+"""
+
+import os
+
+MISTRAL_DEFAULT_URL = "https://api.mistral.ai/v1/chat/completions"
+MISTRAL_API_URL = os.getenv("MISTRAL_API_URL") or MISTRAL_DEFAULT_URL
+MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY")
+MISTRAL_MODEL = os.getenv("MISTRAL_MODEL", "mistral-small-latest")
+MISTRAL_TIMEOUT = float(os.getenv("MISTRAL_TIMEOUT", 30))
+MISTRAL_MAX_TOKENS = int(os.getenv("MISTRAL_MAX_TOKENS", 512))
+
+class MistralResponseError(ValueError):
+    """The backend answered 2xx but without a chat completion in it (not retryable)"""
+
+class MistralClient:
+    def __init__(self, url=MISTRAL_API_URL, api_key=MISTRAL_API_KEY, model=MISTRAL_MODEL,
+                 timeout=MISTRAL_TIMEOUT, max_tokens=MISTRAL_MAX_TOKENS):
+        self.url = url
+        self.api_key = api_key
+        self.model = model
+        self.timeout = timeout
+        self.max_tokens = max_tokens
+        self._http = None
+
+    @property
+    def configured(self):
+        """The hosted API needs a key; a self-hosted URL may not"""
+        return bool(self.api_key) or self.url != MISTRAL_DEFAULT_URL
+
+    async def chat(self, messages):
+        """messages: [{"role": "system"|"user"|"assistant", "content": str}]; returns the reply text"""
+        import httpx  # first use only: keeps bot startup light
+        if self._http is None:
+            headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+            self._http = httpx.AsyncClient(timeout=self.timeout, headers=headers)
+        response = await self._http.post(self.url, json={
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": self.max_tokens
+        })
+        response.raise_for_status()
+        try:
+            content = response.json()["choices"][0]["message"]["content"]
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise MistralResponseError(f"No chat completion in backend reply: {e!r}") from None
+        if not isinstance(content, str) or not content.strip():
+            raise MistralResponseError("Empty chat completion")
+        return content.strip()
+
+    async def close(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
@@ -1,9 +1,10 @@
-from PIL import Image
 from self_heal import self_heal
+from nft_media import open_image, save_image
 
 def convert_to_nft(img_path, output="nft.png"):
     try:
-        Image.open(img_path).convert("RGB").save(output)
+        # Reduced-size decode, tuned encode for the output extension
+        save_image(open_image(img_path), output)
         return output
     except Exception as e:
         self_heal(f"NFT conversion failed: {e}")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+ECOSYSTEM NFT BATCH: Generate NFTs for a whole catalog section (or the entire catalog)
+Parallel rendering, per-item checkpoint for crash resume, one registry + catalog flush at the end.
+"""
+
+import asyncio, hashlib, json, os, time
+from concurrent.futures import ThreadPoolExecutor
+from journal import Journal
+from self_heal import self_heal
+
+BATCH_WORKERS = int(os.getenv("NFT_BATCH_WORKERS", os.cpu_count() or 2))
+PROGRESS_EVERY = 0.1  # report progress every 10% of the batch
+
+def product_key(section_title, product_name):
+    return f"{section_title}\x1f{product_name}"
+
+class NFTBatchJob:
+    """
+    Renders every product in scope that has no NFT yet.
+
+    Each finished render is appended to the job's checkpoint journal, so a crashed
+    batch resumes where it stopped when the same scope is run again. Rendered
+    records are only registered (registry + catalog) once, after the last render.
+    """
+
+    def __init__(self, nft_layer, catalog, section_title=None, workers=BATCH_WORKERS):
+        self.nft = nft_layer
+        self.catalog = catalog
+        self.section_title = section_title  # None = whole catalog
+        self.workers = workers
+        self.job_id = hashlib.sha256((section_title or "*").encode()).hexdigest()[:12]
+        self.checkpoint = Journal(
+            f"{nft_layer.nft_dir}/batch_{self.job_id}.json",
+            f"{nft_layer.nft_dir}/batch_{self.job_id}.log",
+            compact_every=float("inf")
+        )
+        self.total = 0
+        self.completed = 0
+        self.failed = 0
+        self.started = None
+        self.finished = None
+
+    @property
+    def scope(self):
+        return self.section_title or "all"
+
+    def _products_in_scope(self):
+        snapshot = self.catalog.snapshot()  # one consistent version while admins keep editing
+        if self.section_title:
+            section = snapshot.get_section(self.section_title)
+            sections = [section] if section else []
+        else:
+            sections = snapshot.sections
+        return [
+            (section["title"], product)
+            for section in sections
+            for product in section["products"]
+            if not product.get("nft_id")
+        ]
+
+    def _load_checkpoint(self):
+        """Records rendered by a previous (crashed) run of this scope, keyed by product"""
+        _, ops = self.checkpoint.load({})
+        return {op["key"]: op["nft"] for op in ops}
+
+    async def run(self, progress=None):
+        """Render, checkpoint and register; progress(done, total) is awaited every ~10%"""
+        self.started = time.time()
+        done = self._load_checkpoint()
+        todo = [(s, p) for s, p in self._products_in_scope() if product_key(s, p["name"]) not in done]
+        self.total = len(done) + len(todo)
+        self.completed = len(done)
+
+        loop = asyncio.get_running_loop()
+        step = max(1, int(self.total * PROGRESS_EVERY))
+        next_report = self.completed + step
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [
+                loop.run_in_executor(
+                    pool, self.nft.render_product_nft, product["name"], section_title, product["specs"]
+                )
+                for section_title, product in todo
+            ]
+            for future in asyncio.as_completed(futures):
+                try:
+                    nft = await future
+                    key = product_key(nft["section_name"], nft["product_name"])
+                    self.checkpoint.append({"scope": self.scope, "key": key, "nft": nft})
+                    done[key] = nft
+                    self.completed += 1
+                except Exception as e:
+                    self.failed += 1
+                    self_heal(f"Batch NFT render failed: {e}")
+
+                if progress and self.completed + self.failed >= next_report:
+                    next_report += step
+                    await progress(self.completed + self.failed, self.total)
+
+        # One flush for the whole batch; keep the checkpoint if it fails so a re-run retries
+        if self.nft.register_nfts(list(done.values())):
+            self._clear_checkpoint()
+        self.finished = time.time()
+        return self.completed, self.failed
+
+    def _clear_checkpoint(self):
+        self.checkpoint.close()
+        for path in (self.checkpoint.snapshot_file, self.checkpoint.log_file):
+            if os.path.exists(path):
+                os.remove(path)
+
+    @staticmethod
+    def pending_checkpoints(nft_dir):
+        """{scope: rendered count} for unfinished batches on disk (resume by re-running the scope)"""
+        pending = {}
+        try:
+            if not os.path.exists(nft_dir):
+                return pending
+            for name in os.listdir(nft_dir):
+                if not (name.startswith("batch_") and name.endswith(".log")):
+                    continue
+                with open(f"{nft_dir}/{name}", "r") as f:
+                    lines = f.readlines()
+                if lines:
+                    pending[json.loads(lines[0])["op"]["scope"]] = len(lines)
+        except Exception as e:
+            self_heal(f"Batch checkpoint scan failed: {e}")
+        return pending
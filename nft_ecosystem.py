@@ -3,106 +3,236 @@
 ECOSYSTEM NFT LAYER: Convert products/media to NFT format, track ownership, link to catalog
 """
 
-from PIL import Image, ImageDraw, ImageFont
-import json, os, hashlib
-from self_heal import self_heal
+import os, hashlib, time
+from collections import Counter
+from self_heal import self_heal, run_callbacks
+from journal import Journal
+from nft_templates import render_product_card, stamp_metadata
+from nft_media import open_image, save_tiers, PHOTO_FORMAT, PHOTO_TIERS, CARD_FORMAT, CARD_TIERS
+
+REGISTRY_COMPACT_EVERY = int(os.getenv("NFT_REGISTRY_COMPACT_EVERY", 1000))
+
+def utc_day(timestamp):
+    return time.strftime("%Y-%m-%d", time.gmtime(timestamp))
+
+class NFTStats:
+    """Registry aggregates, updated per op so reads never scan the registry"""
+
+    def __init__(self):
+        self.total = 0
+        self.owned = 0
+        self.owner_counts = Counter()  # owner_id -> NFTs owned
+        self.by_section = Counter()    # section_name -> NFTs created
+        self.by_day = Counter()        # YYYY-MM-DD (UTC) -> NFTs created
+
+    def nft_created(self, nft):
+        self.total += 1
+        self.by_section[nft["section_name"]] += 1
+        self.by_day[utc_day(nft["created_timestamp"])] += 1
+
+    def ownership_changed(self, previous_owner, owner_id):
+        if previous_owner is None:
+            self.owned += 1
+        else:
+            self.owner_counts[previous_owner] -= 1
+            if self.owner_counts[previous_owner] <= 0:
+                del self.owner_counts[previous_owner]
+        self.owner_counts[owner_id] += 1
+
+    @classmethod
+    def from_registry(cls, registry):
+        """Rebuild from a loaded registry snapshot (startup only)"""
+        stats = cls()
+        for nft in registry["nfts"]:
+            stats.nft_created(nft)
+        for ownership in registry["ownership"].values():
+            stats.ownership_changed(None, ownership["owner_id"])
+        return stats
 
 class NFTEcosystem:
-    def __init__(self, nft_dir="nft_assets", catalog_manager=None):
+    def __init__(self, nft_dir="nft_assets", catalog_manager=None, autoload=True):
         self.nft_dir = nft_dir
         self.catalog = catalog_manager
-        self.nft_registry = self._load_registry()
         
         if not os.path.exists(nft_dir):
             os.makedirs(nft_dir)
+        
+        self.journal = Journal(
+            f"{self.nft_dir}/registry.json",
+            f"{self.nft_dir}/registry.log",
+            compact_every=REGISTRY_COMPACT_EVERY
+        )
+        self._nft_index = {}  # nft_id -> registry record
+        self.stats = NFTStats()
+        self.on_change = []   # callbacks run after every registry update
+        self.nft_registry = self._load_registry() if autoload else {"nfts": [], "ownership": {}}
+
+    def load(self):
+        """Replay the registry journal into memory"""
+        self.nft_registry = self._load_registry()
+        return self
 
     def _load_registry(self):
-        """Load NFT ownership registry"""
-        registry_file = f"{self.nft_dir}/registry.json"
+        """Load NFT ownership registry: snapshot + replay of the op log tail"""
         try:
-            if os.path.exists(registry_file):
-                with open(registry_file, "r") as f:
-                    return json.load(f)
-            return {"nfts": [], "ownership": {}}
+            registry, ops = self.journal.load({"nfts": [], "ownership": {}})
+            self.nft_registry = registry
+            self._nft_index = {nft["nft_id"]: nft for nft in registry["nfts"]}
+            self.stats = NFTStats.from_registry(registry)
+            for op in ops:
+                self._apply_op(op)
+            return registry
         except Exception as e:
             self_heal(f"NFT registry load failed: {e}")
+            self._nft_index = {}
+            self.stats = NFTStats()
             return {"nfts": [], "ownership": {}}
 
-    def _save_registry(self):
-        """Save NFT registry"""
+    def _apply_op(self, op):
+        """Apply one registry op to the in-memory state (used live and on replay)"""
+        if op["type"] == "nft_created":
+            nft = op["nft"]
+            existing = self._nft_index.get(nft["nft_id"])
+            if existing is not None:
+                # Re-registration (e.g. a resumed batch): ownership is only changed by ownership ops
+                existing.update(nft, owner=existing.get("owner"))
+            else:
+                self.nft_registry["nfts"].append(nft)
+                self._nft_index[nft["nft_id"]] = nft
+                self.stats.nft_created(nft)
+        elif op["type"] == "ownership":
+            nft = self._nft_index.get(op["nft_id"])
+            if nft is None:
+                return
+            previous = self.nft_registry["ownership"].get(op["nft_id"])
+            self.stats.ownership_changed(previous["owner_id"] if previous else None, op["owner_id"])
+            nft["owner"] = op["owner_id"]
+            self.nft_registry["ownership"][op["nft_id"]] = {
+                "owner_id": op["owner_id"],
+                "acquired_timestamp": op["acquired_timestamp"],
+                "product_name": nft["product_name"]
+            }
+
+    def _record_ops(self, ops):
+        """Persist ops as one append, then apply them; compact when the log grows"""
         try:
-            registry_file = f"{self.nft_dir}/registry.json"
-            with open(registry_file, "w") as f:
-                json.dump(self.nft_registry, f, indent=2)
+            # Memory only moves once the ops are durable: a failed append leaves both unchanged
+            if not self.journal.append_many(ops):
+                return False
+            for op in ops:
+                self._apply_op(op)
+            run_callbacks(self.on_change, "NFT")
+            if self.journal.should_compact():
+                self._save_registry()
             return True
         except Exception as e:
-            self_heal(f"NFT registry save failed: {e}")
+            self_heal(f"NFT registry update failed: {e}")
             return False
 
-    def convert_image_to_nft(self, img_path, product_name, section_name, metadata=None):
-        """Convert image to NFT with metadata embedding"""
+    def _save_registry(self):
+        """Compact: write a full registry snapshot and truncate the op log"""
+        return self.journal.compact(self.nft_registry)
+
+    def convert_image_to_nft(self, img_path, product_name, section_name, metadata=None, tiers=PHOTO_TIERS):
+        """Convert image (file path or in-memory buffer) to NFT with metadata embedding"""
         try:
-            # Load and convert image
-            img = Image.open(img_path).convert("RGB")
-            
-            # Generate NFT ID (hash of content + timestamp)
-            nft_id = hashlib.sha256(
-                f"{product_name}{section_name}{os.path.getmtime(img_path)}".encode()
-            ).hexdigest()[:16]
-            
-            # Create NFT with embedded metadata
-            nft_path = f"{self.nft_dir}/{nft_id}_nft.png"
-            
-            # Add metadata watermark
-            draw = ImageDraw.Draw(img)
-            metadata_text = f"NFT:{nft_id[:8]}\nProduct:{product_name}"
-            
-            try:
-                font = ImageFont.load_default()
-                draw.text((10, 10), metadata_text, fill=(255, 255, 255), font=font)
-            except:
-                pass  # If font not available, skip overlay
-            
-            img.save(nft_path)
-            
-            # Register in catalog
-            if self.catalog:
-                self.catalog.register_product_nft(section_name, product_name, nft_path)
-            
-            # Record in registry
-            nft_record = {
-                "nft_id": nft_id,
-                "product_name": product_name,
-                "section_name": section_name,
-                "nft_file": nft_path,
-                "original_file": img_path,
-                "metadata": metadata or {},
-                "created_timestamp": os.path.getmtime(img_path),
-                "owner": None
-            }
-            
-            self.nft_registry["nfts"].append(nft_record)
-            self._save_registry()
-            
-            return nft_id, nft_path
+            nft_record = self.render_image_nft(img_path, product_name, section_name, metadata, tiers)
+            self.register_nfts([nft_record])
+            return nft_record["nft_id"], nft_record["nft_file"]
         except Exception as e:
             self_heal(f"Convert image to NFT failed: {e}")
             return None, None
 
+    def render_image_nft(self, img_path, product_name, section_name, metadata=None, tiers=PHOTO_TIERS,
+                         deadline=None):
+        """Render an image NFT to disk without registering it (safe in worker threads)"""
+        # Decode at reduced size - phone photos never need full resolution
+        img = open_image(img_path)
+        from_path = isinstance(img_path, str)
+        return self._render_nft(
+            img,
+            product_name,
+            section_name,
+            metadata=metadata,
+            original_file=img_path if from_path else None,
+            created_timestamp=os.path.getmtime(img_path) if from_path else None,
+            output_format=PHOTO_FORMAT,
+            tiers=tiers,
+            deadline=deadline
+        )
+
+    def _mint_nft(self, img, product_name, section_name, metadata=None, original_file=None,
+                  created_timestamp=None, output_format=CARD_FORMAT, tiers=CARD_TIERS):
+        """Watermark, save, register in catalog and record an in-memory image as NFT"""
+        nft_record = self._render_nft(
+            img, product_name, section_name, metadata, original_file,
+            created_timestamp, output_format, tiers
+        )
+        self.register_nfts([nft_record])
+        return nft_record["nft_id"], nft_record["nft_file"]
+
+    def _render_nft(self, img, product_name, section_name, metadata=None, original_file=None,
+                    created_timestamp=None, output_format=CARD_FORMAT, tiers=CARD_TIERS, deadline=None):
+        """Watermark and write NFT assets; returns the registry record without registering it"""
+        created_timestamp = created_timestamp or time.time()
+        
+        # Generate NFT ID (hash of content + timestamp)
+        nft_id = hashlib.sha256(
+            f"{product_name}{section_name}{created_timestamp}".encode()
+        ).hexdigest()[:16]
+        
+        # Add metadata watermark
+        try:
+            stamp_metadata(img, f"NFT:{nft_id[:8]}\nProduct:{product_name}")
+        except Exception:
+            pass  # If font not available, skip overlay
+        
+        # Last cancellation point: nothing has been written to disk yet
+        if deadline:
+            deadline.check()
+        
+        # Encode the requested output tiers; "full" is the NFT asset itself
+        assets, asset_hashes = save_tiers(img, f"{self.nft_dir}/{nft_id}", output_format, tiers)
+        
+        return {
+            "nft_id": nft_id,
+            "product_name": product_name,
+            "section_name": section_name,
+            "nft_file": assets["full"],
+            "assets": assets,
+            "asset_hashes": asset_hashes,
+            "original_file": original_file,
+            "metadata": metadata or {},
+            "created_timestamp": created_timestamp,
+            "owner": None
+        }
+
+    def register_nfts(self, nft_records):
+        """Register rendered NFTs in catalog + registry with one persistence flush each (idempotent by nft_id)"""
+        try:
+            if self.catalog:
+                with self.catalog.batch_updates():
+                    for nft in nft_records:
+                        self.catalog.register_product_nft(
+                            nft["section_name"], nft["product_name"], nft["nft_file"], nft_id=nft["nft_id"]
+                        )
+            new_records = [nft for nft in nft_records if nft["nft_id"] not in self._nft_index]
+            return self._record_ops([{"type": "nft_created", "nft": nft} for nft in new_records])
+        except Exception as e:
+            self_heal(f"Register NFTs failed: {e}")
+            return False
+
     def assign_nft_ownership(self, nft_id, owner_user_id):
         """Assign NFT to user/subscriber"""
         try:
-            for nft in self.nft_registry["nfts"]:
-                if nft["nft_id"] == nft_id:
-                    nft["owner"] = owner_user_id
-                    self.nft_registry["ownership"][nft_id] = {
-                        "owner_id": owner_user_id,
-                        "acquired_timestamp": os.times(),
-                        "product_name": nft["product_name"]
-                    }
-                    self._save_registry()
-                    return True
-            return False
+            if nft_id not in self._nft_index:
+                return False
+            return self._record_ops([{
+                "type": "ownership",
+                "nft_id": nft_id,
+                "owner_id": owner_user_id,
+                "acquired_timestamp": time.time()
+            }])
         except Exception as e:
             self_heal(f"Assign NFT ownership failed: {e}")
             return False
@@ -110,10 +240,7 @@ class NFTEcosystem:
     def get_nft_by_id(self, nft_id):
         """Retrieve NFT metadata and file"""
         try:
-            for nft in self.nft_registry["nfts"]:
-                if nft["nft_id"] == nft_id:
-                    return nft
-            return None
+            return self._nft_index.get(nft_id)
         except Exception as e:
             self_heal(f"Get NFT failed: {e}")
             return None
@@ -135,56 +262,50 @@ class NFTEcosystem:
     def generate_product_nft(self, product_name, section_name, product_specs):
         """Generate NFT from product data without image"""
         try:
-            # Create image from scratch
-            img = Image.new("RGB", (400, 300), color=(20, 20, 20))
-            draw = ImageDraw.Draw(img)
-            
-            # Draw product info
-            draw.text((20, 20), f"NTRLI' {section_name}", fill=(255, 200, 0))
-            draw.text((20, 60), product_name, fill=(255, 255, 255))
-            draw.text((20, 100), product_specs, fill=(200, 200, 200))
-            draw.text((20, 150), "Verified Product", fill=(0, 255, 100))
+            # Composite variable fields onto the pre-rendered card template
+            img = render_product_card(product_name, section_name, product_specs)
             
-            # Save temporary
-            temp_path = f"{self.nft_dir}/temp_product.png"
-            img.save(temp_path)
-            
-            # Convert to NFT
-            nft_id, nft_path = self.convert_image_to_nft(
-                temp_path,
+            return self._mint_nft(
+                img,
                 product_name,
                 section_name,
                 metadata={"generated": True, "specs": product_specs}
             )
-            
-            # Cleanup temp
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            
-            return nft_id, nft_path
         except Exception as e:
             self_heal(f"Generate product NFT failed: {e}")
             return None, None
 
+    def render_product_nft(self, product_name, section_name, product_specs):
+        """Render a product NFT to disk without registering it (safe in worker threads)"""
+        img = render_product_card(product_name, section_name, product_specs)
+        return self._render_nft(
+            img,
+            product_name,
+            section_name,
+            metadata={"generated": True, "specs": product_specs}
+        )
+
     def get_nft_stats(self):
-        """Get NFT ecosystem statistics"""
+        """Get NFT ecosystem statistics (O(1), maintained incrementally)"""
         try:
-            total_nfts = len(self.nft_registry["nfts"])
-            owned_nfts = len(self.nft_registry["ownership"])
-            unique_owners = len(set(
-                v["owner_id"] for v in self.nft_registry["ownership"].values()
-            ))
-            
             return {
-                "total_nfts_generated": total_nfts,
-                "nfts_with_ownership": owned_nfts,
-                "unique_owners": unique_owners,
-                "unowned_nfts": total_nfts - owned_nfts
+                "total_nfts_generated": self.stats.total,
+                "nfts_with_ownership": self.stats.owned,
+                "unique_owners": len(self.stats.owner_counts),
+                "unowned_nfts": self.stats.total - self.stats.owned,
+                "generated_today": self.stats.by_day.get(utc_day(time.time()), 0)
             }
         except Exception as e:
             self_heal(f"Get NFT stats failed: {e}")
             return {}
 
+    def get_nft_breakdown(self):
+        """NFTs created per section and per day (UTC)"""
+        return {
+            "by_section": dict(self.stats.by_section),
+            "by_day": dict(self.stats.by_day)
+        }
+
     def list_all_nfts(self):
         """List all NFTs in ecosystem"""
         return self.nft_registry["nfts"]
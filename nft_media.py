@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+ECOSYSTEM NFT MEDIA: Size-aware image decoding and output format tiers
+Uploads are decoded at reduced size (JPEG draft / reduce) and re-encoded per tier.
+"""
+
+from PIL import Image
+import hashlib, io, os
+from self_heal import self_heal
+
+FORMAT_EXTENSIONS = {"JPEG": "jpg", "WEBP": "webp", "PNG": "png"}
+EXTENSION_FORMATS = {"jpg": "JPEG", "jpeg": "JPEG", "webp": "WEBP", "png": "PNG"}
+
+def _format_setting(name, default):
+    """Output format from the environment; an unsupported value falls back to default instead of failing every mint"""
+    value = os.getenv(name, default).strip()
+    value = EXTENSION_FORMATS.get(value.lower(), value.upper())  # "jpg" means JPEG
+    if value not in FORMAT_EXTENSIONS:
+        self_heal(f"{name}={value!r} is not one of {', '.join(FORMAT_EXTENSIONS)}, using {default}")
+        return default
+    return value
+
+MAX_DIMENSION = int(os.getenv("NFT_MAX_DIMENSION", 1600))
+PREVIEW_DIMENSION = int(os.getenv("NFT_PREVIEW_DIMENSION", 320))
+PHOTO_FORMAT = _format_setting("NFT_PHOTO_FORMAT", "JPEG")
+CARD_FORMAT = _format_setting("NFT_CARD_FORMAT", "PNG")
+PREVIEW_FORMAT = _format_setting("NFT_PREVIEW_FORMAT", "JPEG")
+
+# Tuned encoder settings per format
+FORMAT_OPTIONS = {
+    "JPEG": {"quality": int(os.getenv("NFT_JPEG_QUALITY", 85)), "optimize": True, "progressive": True},
+    "WEBP": {"quality": int(os.getenv("NFT_WEBP_QUALITY", 80)), "method": 4},
+    "PNG": {"compress_level": 6},
+}
+
+# tier name -> (max dimension, format, file suffix)
+OUTPUT_TIERS = {
+    "full": (MAX_DIMENSION, None, "nft"),
+    "preview": (PREVIEW_DIMENSION, PREVIEW_FORMAT, "preview"),
+}
+
+def _tiers_setting(name, default):
+    """Extra output tiers from the environment; unknown names are dropped with a warning"""
+    tiers = []
+    for tier in (t.strip() for t in os.getenv(name, default).split(",")):
+        if not tier or tier == "full" or tier in tiers:
+            continue
+        if tier not in OUTPUT_TIERS:
+            self_heal(f"{name} names unknown tier {tier!r} (known: {', '.join(OUTPUT_TIERS)}), ignoring it")
+            continue
+        tiers.append(tier)
+    return tuple(tiers)
+
+# "full" is always produced - it is the NFT asset itself
+PHOTO_TIERS = ("full",) + _tiers_setting("NFT_PHOTO_TIERS", "preview")
+CARD_TIERS = ("full",)
+
+def open_image(source, max_dimension=MAX_DIMENSION):
+    """Decode an image (path or file object) no larger than max_dimension on its long side"""
+    img = Image.open(source)
+    if img.format == "JPEG":
+        # Let libjpeg decode at 1/2, 1/4 or 1/8 scale instead of full resolution
+        img.draft("RGB", (max_dimension, max_dimension))
+    if max(img.size) > max_dimension:
+        # thumbnail() box-reduces first (Image.reduce) and only resamples the remainder
+        img.thumbnail((max_dimension, max_dimension), Image.BICUBIC, reducing_gap=2.0)
+    return img.convert("RGB")
+
+def fit(img, max_dimension):
+    """Return img scaled down to max_dimension (a copy only when resizing is needed)"""
+    if max(img.size) <= max_dimension:
+        return img
+    resized = img.copy()
+    resized.thumbnail((max_dimension, max_dimension), Image.BICUBIC, reducing_gap=2.0)
+    return resized
+
+def encode(img, fmt):
+    """Encode img with the tuned settings for fmt; returns bytes"""
+    buffer = io.BytesIO()
+    img.save(buffer, format=fmt, **FORMAT_OPTIONS.get(fmt, {}))
+    return buffer.getvalue()
+
+def _write(data, path):
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+def save_image(img, path, fmt=None):
+    """Save img with tuned settings, format taken from fmt or the file extension"""
+    fmt = fmt or EXTENSION_FORMATS.get(os.path.splitext(path)[1].lstrip(".").lower(), "PNG")
+    return _write(encode(img, fmt), path)
+
+def save_tiers(img, path_prefix, fmt, tiers=("full",)):
+    """Write the requested output tiers; returns ({tier: path}, {tier: sha256 of the bytes})"""
+    assets = {}
+    hashes = {}
+    for tier in tiers:
+        max_dimension, tier_format, suffix = OUTPUT_TIERS[tier]
+        tier_format = tier_format or fmt
+        data = encode(fit(img, max_dimension), tier_format)
+        assets[tier] = _write(data, f"{path_prefix}_{suffix}.{FORMAT_EXTENSIONS[tier_format]}")
+        hashes[tier] = hashlib.sha256(data).hexdigest()
+    return assets, hashes
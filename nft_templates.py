@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+ECOSYSTEM NFT TEMPLATES: Pre-rendered card chrome, cached fonts and text layers
+Static layers are drawn once per process; each card only composites its variable fields.
+ImageDraw/ImageFont are imported on first render, so importing this module stays cheap.
+"""
+
+from functools import lru_cache
+
+CARD_SIZE = (400, 300)
+CARD_BACKGROUND = (20, 20, 20)
+WATERMARK_POSITION = (10, 10)
+WATERMARK_FILL = (255, 255, 255)
+
+@lru_cache(maxsize=None)
+def _measure():
+    """Scratch surface for text measurement only"""
+    from PIL import Image, ImageDraw
+    return ImageDraw.Draw(Image.new("L", (1, 1)))
+
+@lru_cache(maxsize=None)
+def get_font():
+    """Load the default font once per process"""
+    from PIL import ImageFont
+    return ImageFont.load_default()
+
+@lru_cache(maxsize=2048)
+def text_layer(text, fill):
+    """Render text once into a transparent RGBA layer; returns (layer, (dx, dy)) relative to draw.text origin"""
+    from PIL import Image, ImageDraw
+    font = get_font()
+    left, top, right, bottom = _measure().multiline_textbbox((0, 0), text, font=font)
+    layer = Image.new("RGBA", (max(right - left, 1), max(bottom - top, 1)), (0, 0, 0, 0))
+    ImageDraw.Draw(layer).multiline_text((-left, -top), text, fill=fill, font=font)
+    return layer, (left, top)
+
+def paste_text(img, position, text, fill):
+    """Composite a cached text layer onto img"""
+    layer, (dx, dy) = text_layer(text, fill)
+    img.paste(layer, (position[0] + dx, position[1] + dy), layer)
+
+class CardTemplate:
+    """
+    A card background with its static labels pre-rendered.
+
+    static_texts: [(position, text, fill)] drawn once into the base layer
+    fields:       {name: (position, format, fill)} composited per card
+    """
+
+    def __init__(self, size, background, static_texts, fields):
+        from PIL import Image
+        self.fields = fields
+        self.base = Image.new("RGB", size, color=background)
+        for position, text, fill in static_texts:
+            paste_text(self.base, position, text, fill)
+
+    def render(self, **values):
+        card = self.base.copy()
+        for name, (position, fmt, fill) in self.fields.items():
+            text = fmt.format(values.get(name, ""))
+            if text:
+                paste_text(card, position, text, fill)
+        return card
+
+@lru_cache(maxsize=None)
+def get_product_card_template():
+    """The product NFT card, built on first use"""
+    return CardTemplate(
+        CARD_SIZE,
+        CARD_BACKGROUND,
+        static_texts=[
+            ((20, 150), "Verified Product", (0, 255, 100)),
+        ],
+        fields={
+            "section_name": ((20, 20), "NTRLI' {}", (255, 200, 0)),
+            "product_name": ((20, 60), "{}", (255, 255, 255)),
+            "product_specs": ((20, 100), "{}", (200, 200, 200)),
+        }
+    )
+
+def render_product_card(product_name, section_name, product_specs):
+    """Render a product NFT card from the cached template"""
+    return get_product_card_template().render(
+        section_name=section_name,
+        product_name=product_name,
+        product_specs=product_specs
+    )
+
+def stamp_metadata(img, text):
+    """Overlay the NFT metadata watermark (unique per NFT, so drawn directly with the cached font)"""
+    from PIL import ImageDraw
+    ImageDraw.Draw(img).multiline_text(WATERMARK_POSITION, text, fill=WATERMARK_FILL, font=get_font())
+    return img
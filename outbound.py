@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+ECOSYSTEM OUTBOUND: Single dispatcher for every message the bot sends
+Per-chat + global token buckets, FloodWait handling, interactive-before-bulk priority,
+and merging of consecutive small text messages to the same chat.
+"""
+
+import asyncio, os, time
+from collections import deque
+from functools import partial
+from telethon.errors import FloodWaitError
+from ratelimit import TokenBucket, KeyedTokenBuckets
+from self_heal import self_heal
+
+INTERACTIVE = 0
+BULK = 1
+
+OUTBOUND_GLOBAL_RATE = float(os.getenv("OUTBOUND_GLOBAL_RATE", 30))   # messages / second
+OUTBOUND_PER_CHAT_RATE = float(os.getenv("OUTBOUND_PER_CHAT_RATE", 1))
+OUTBOUND_PER_CHAT_BURST = int(os.getenv("OUTBOUND_PER_CHAT_BURST", 3))
+OUTBOUND_SENDERS = int(os.getenv("OUTBOUND_SENDERS", 8))
+MAX_MESSAGE_LENGTH = 4096
+MERGE_SEPARATOR = "\n\n"
+GLOBAL_FLOOD_WINDOW = 1.0  # FloodWaits on 2+ chats within this window => global limit
+
+def split_message(text, limit=MAX_MESSAGE_LENGTH):
+    """Split text into Telegram-sized pages, preferring paragraph then line boundaries"""
+    pages = []
+    while len(text) > limit:
+        cut = text.rfind(MERGE_SEPARATOR, 0, limit)
+        if cut <= 0:
+            cut = text.rfind("\n", 0, limit)
+        if cut <= 0:
+            cut = limit
+        pages.append(text[:cut])
+        text = text[cut:].lstrip("\n")
+    pages.append(text)
+    return pages
+
+def _consume_exception(future):
+    # Fire-and-forget callers never await; don't let asyncio warn about it
+    if not future.cancelled():
+        future.exception()
+
+class _Outgoing:
+    __slots__ = ("send", "text", "kwargs", "priority", "future")
+
+    def __init__(self, send, text, kwargs, priority, future):
+        self.send = send
+        self.text = text
+        self.kwargs = kwargs
+        self.priority = priority
+        self.future = future
+
+    @property
+    def mergeable(self):
+        return not self.kwargs and isinstance(self.text, str)
+
+class OutboundEvent:
+    """Event proxy whose respond() goes through the dispatcher; everything else passes through"""
+
+    __slots__ = ("_event", "_dispatcher")
+
+    def __init__(self, event, dispatcher):
+        self._event = event
+        self._dispatcher = dispatcher
+
+    def __getattr__(self, name):
+        return getattr(self._event, name)
+
+    def respond(self, *args, **kwargs):
+        return self._dispatcher.respond(self._event, *args, **kwargs)
+
+class OutboundDispatcher:
+    def __init__(self, client, global_rate=OUTBOUND_GLOBAL_RATE, per_chat_rate=OUTBOUND_PER_CHAT_RATE,
+                 per_chat_burst=OUTBOUND_PER_CHAT_BURST, senders=OUTBOUND_SENDERS):
+        self.client = client
+        self.global_bucket = TokenBucket(global_rate)
+        self.chat_buckets = KeyedTokenBuckets(per_chat_rate, per_chat_burst)
+        self.senders = senders
+        self._queues = {}                    # chat_id -> deque[_Outgoing]
+        self._ready = (deque(), deque())     # per priority: chat_ids ready to send
+        self._scheduled = set()              # chats that are ready, delayed or in flight
+        self._has_ready = asyncio.Event()
+        self._recent_floods = deque()        # (monotonic time, chat_id)
+        self.sent = 0
+        self.merged = 0
+        self.failed = 0
+        self.flood_waits = 0
+
+    # ------------------------------------------------------------------
+    # Producers
+    # ------------------------------------------------------------------
+
+    def wrap(self, event):
+        if isinstance(event, OutboundEvent):
+            return event
+        return OutboundEvent(event, self)
+
+    def respond(self, event, message=None, priority=INTERACTIVE, **kwargs):
+        """Queue event.respond(); returns a future resolving to the sent Message"""
+        return self._submit(event.chat_id, event.respond, message, kwargs, priority)
+
+    def send_message(self, chat_id, message=None, priority=BULK, **kwargs):
+        """Queue client.send_message(chat_id); returns a future resolving to the sent Message"""
+        return self._submit(chat_id, partial(self.client.send_message, chat_id), message, kwargs, priority)
+
+    def pending(self):
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _submit(self, chat_id, send, text, kwargs, priority):
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+        self._queues.setdefault(chat_id, deque()).append(_Outgoing(send, text, kwargs, priority, future))
+        if chat_id not in self._scheduled:
+            self._scheduled.add(chat_id)
+            self._make_ready(chat_id)
+        return future
+
+    def _make_ready(self, chat_id):
+        queue = self._queues.get(chat_id)
+        if not queue:
+            self._scheduled.discard(chat_id)
+            self._queues.pop(chat_id, None)
+            return
+        self._ready[queue[0].priority].append(chat_id)
+        self._has_ready.set()
+
+    # ------------------------------------------------------------------
+    # Senders
+    # ------------------------------------------------------------------
+
+    async def run(self):
+        await asyncio.gather(*(self._sender() for _ in range(self.senders)))
+
+    async def _next_chat(self):
+        while True:
+            for ready in self._ready:
+                if ready:
+                    return ready.popleft()
+            self._has_ready.clear()
+            await self._has_ready.wait()
+
+    @staticmethod
+    def _drop_cancelled(queue):
+        """Skip sends whose caller gave up (deadline passed) before they reached the wire"""
+        while queue and queue[0].future.cancelled():
+            queue.popleft()
+
+    def _take_batch(self, queue):
+        """Pop the head item plus any directly following small texts that fit in one message"""
+        head = queue.popleft()
+        batch = [head]
+        if not head.mergeable:
+            return batch, head.text
+        text = head.text
+        self._drop_cancelled(queue)
+        while queue and queue[0].mergeable and queue[0].priority == head.priority:
+            candidate = text + MERGE_SEPARATOR + queue[0].text
+            if len(candidate) > MAX_MESSAGE_LENGTH:
+                break
+            text = candidate
+            batch.append(queue.popleft())
+            self._drop_cancelled(queue)
+        return batch, text
+
+    async def _sender(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            chat_id = await self._next_chat()
+            try:
+                self._drop_cancelled(self._queues.get(chat_id, ()))
+                if not self._queues.get(chat_id):
+                    self._make_ready(chat_id)
+                    continue
+                wait = self.chat_buckets.get(chat_id).try_acquire()
+                if wait:
+                    loop.call_later(wait, self._make_ready, chat_id)
+                    continue
+                await self.global_bucket.acquire()
+
+                queue = self._queues[chat_id]
+                self._drop_cancelled(queue)
+                if not queue:
+                    self._make_ready(chat_id)
+                    continue
+                batch, text = self._take_batch(queue)
+                head = batch[0]
+                try:
+                    message = await head.send(text, **head.kwargs)
+                except FloodWaitError as e:
+                    self._on_flood(chat_id, e.seconds)
+                    queue.extendleft(reversed(batch))
+                    loop.call_later(e.seconds, self._make_ready, chat_id)
+                    continue
+                except Exception as e:
+                    self.failed += len(batch)
+                    self_heal(f"Outbound send to {chat_id} failed: {e}")
+                    for item in batch:
+                        if not item.future.done():
+                            item.future.set_exception(e)
+                else:
+                    self.sent += 1
+                    self.merged += len(batch) - 1
+                    for item in batch:
+                        if not item.future.done():
+                            item.future.set_result(message)
+                self._make_ready(chat_id)
+            except Exception as e:
+                self_heal(f"Outbound dispatcher error: {e}")
+                self._make_ready(chat_id)
+
+    def _on_flood(self, chat_id, seconds):
+        """Back off the chat; if several chats flood at once it is the global limit"""
+        self.flood_waits += 1
+        self.chat_buckets.get(chat_id).pause(seconds)
+        now = time.monotonic()
+        self._recent_floods.append((now, chat_id))
+        while self._recent_floods and now - self._recent_floods[0][0] > GLOBAL_FLOOD_WINDOW:
+            self._recent_floods.popleft()
+        if len({chat for _, chat in self._recent_floods}) >= 2:
+            self.global_bucket.pause(seconds)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+ECOSYSTEM RATE LIMITING: Token buckets for Telegram send limits
+Global and per-chat buckets; FloodWait pauses a bucket for the time Telegram asks for.
+"""
+
+import asyncio, time
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = rate                      # tokens per second
+        self.capacity = capacity or rate      # burst size
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now):
+        if now <= self.updated:
+            return  # paused: nothing accrues until blocked_until
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, tokens=1):
+        """Take tokens if available; returns 0 on success, else seconds to wait"""
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self._refill(now)
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return 0
+        return (tokens - self.tokens) / self.rate
+
+    async def acquire(self, tokens=1):
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds):
+        """Block the bucket (FloodWait) and drain it so traffic resumes gently"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0
+        self.updated = self.blocked_until  # refill starts when the block ends, not from before it
+
+    def is_idle(self, now=None):
+        """Full and unblocked - safe to forget"""
+        now = now or time.monotonic()
+        if now < self.blocked_until:
+            return False
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+class KeyedTokenBuckets:
+    """One bucket per key (chat), pruning idle buckets so memory stays bounded"""
+
+    def __init__(self, rate, capacity=None, prune_every=1024):
+        self.rate = rate
+        self.capacity = capacity
+        self.prune_every = prune_every
+        self.buckets = {}
+        self._since_prune = 0
+
+    def get(self, key):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            self._since_prune += 1
+            if self._since_prune >= self.prune_every:
+                self.prune()
+            bucket = self.buckets[key] = TokenBucket(self.rate, self.capacity)
+        return bucket
+
+    def prune(self):
+        now = time.monotonic()
+        self.buckets = {key: b for key, b in self.buckets.items() if not b.is_idle(now)}
+        self._since_prune = 0
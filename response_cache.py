@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+ECOSYSTEM RESPONSE CACHE: Pre-rendered responses, warmed at startup
+Entries are tagged with the data they depend on and rebuilt lazily after that data changes.
+"""
+
+from collections import defaultdict
+from self_heal import self_heal
+
+class ResponseCache:
+    def __init__(self):
+        self._builders = {}              # key -> builder()
+        self._values = {}                # key -> (bucket, cached response)
+        self._buckets = {}               # key -> bucket(), for entries that also depend on time
+        self._tagged = defaultdict(set)  # tag -> keys depending on it
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, key, builder, tags=(), bucket=None):
+        """bucket() (e.g. the current day) is part of the entry's key: a new bucket value rebuilds it"""
+        self._builders[key] = builder
+        self._values.pop(key, None)
+        if bucket is not None:
+            self._buckets[key] = bucket
+        for tag in tags:
+            self._tagged[tag].add(key)
+
+    def __contains__(self, key):
+        return key in self._builders
+
+    def _bucket(self, key):
+        bucket = self._buckets.get(key)
+        return bucket() if bucket is not None else None
+
+    def get(self, key):
+        bucket = self._bucket(key)
+        cached = self._values.get(key)
+        if cached is None or cached[0] != bucket:
+            self.misses += 1
+            return self._build(key, bucket)
+        self.hits += 1
+        return cached[1]
+
+    def _build(self, key, bucket):
+        value = self._builders[key]()
+        self._values[key] = (bucket, value)
+        return value
+
+    def invalidate(self, *tags):
+        """Drop every entry depending on any of the tags (or keyed by them)"""
+        for tag in tags:
+            self._values.pop(tag, None)
+            for key in self._tagged.get(tag, ()):
+                self._values.pop(key, None)
+
+    def invalidator(self, *tags):
+        """Callback for a layer's on_change hooks"""
+        return lambda: self.invalidate(*tags)
+
+    def warm(self):
+        """Build every registered entry now (startup), so first requests hit"""
+        for key in self._builders:
+            try:
+                if key not in self._values:
+                    self._build(key, self._bucket(key))
+            except Exception as e:
+                self_heal(f"Response cache warm failed for {key}: {e}")
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+ECOSYSTEM RETRY: Async-aware retries with backoff, jitter and a global retry budget
+Only transient errors are retried; the budget caps retries to a fraction of real traffic,
+so an outage is not multiplied by every caller retrying at once.
+"""
+
+import asyncio, random, sys, threading, time
+from telethon.errors import FloodWaitError, RPCError, ServerError
+from self_heal import self_heal
+
+class RetryBudget:
+    """Each first attempt deposits `ratio` tokens, each retry spends one; min_per_second keeps a floor"""
+
+    def __init__(self, ratio=0.2, min_per_second=1.0, max_tokens=20.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.updated = time.monotonic()
+        self.retries = 0
+        self.exhausted = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, amount):
+        now = time.monotonic()
+        self.tokens = min(self.max_tokens, self.tokens + amount + (now - self.updated) * self.min_per_second)
+        self.updated = now
+
+    def record_attempt(self):
+        with self._lock:
+            self._refill(self.ratio)
+
+    def try_spend(self):
+        with self._lock:
+            self._refill(0)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                self.retries += 1
+                return True
+            self.exhausted += 1
+            return False
+
+RETRY_BUDGET = RetryBudget()
+
+def is_transient(exc):
+    """Default classification: network trouble, timeouts and server-side errors are worth retrying"""
+    if isinstance(exc, FloodWaitError):
+        return False  # the outbound dispatcher owns FloodWait back-off
+    if isinstance(exc, RPCError):
+        return isinstance(exc, ServerError)
+    # httpx is imported by its first caller; an error can only be an httpx error once it is loaded
+    httpx = sys.modules.get("httpx")
+    if httpx is not None:
+        if isinstance(exc, httpx.HTTPStatusError):
+            return exc.response.status_code == 429 or exc.response.status_code >= 500
+        if isinstance(exc, httpx.TransportError):
+            return True
+    return isinstance(exc, (ConnectionError, TimeoutError, asyncio.TimeoutError))
+
+class RetryPolicy:
+    def __init__(self, attempts=3, base_delay=0.5, max_delay=10.0, retryable=is_transient, budget=RETRY_BUDGET):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retryable = retryable
+        self.budget = budget
+
+    def delay(self, attempt):
+        """Full jitter: uniform in [0, min(max_delay, base * 2^attempt)]"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+DEFAULT_POLICY = RetryPolicy()
+
+class RetryResult:
+    """Outcome of a retried call: value on success, the last error otherwise"""
+
+    __slots__ = ("value", "error", "attempts", "gave_up")
+
+    def __init__(self, value=None, error=None, attempts=0, gave_up=None):
+        self.value = value
+        self.error = error
+        self.attempts = attempts
+        self.gave_up = gave_up   # why retrying stopped: "permanent", "attempts", "budget", "deadline"
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def unwrap(self):
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+    def value_or(self, default):
+        return self.value if self.error is None else default
+
+    def __repr__(self):
+        if self.ok:
+            return f"RetryResult(ok, attempts={self.attempts})"
+        return f"RetryResult({type(self.error).__name__}, attempts={self.attempts}, gave_up={self.gave_up})"
+
+def _next_delay(policy, attempt, error, deadline):
+    """Seconds to wait before the next attempt, or the reason to give up"""
+    if not policy.retryable(error):
+        return None, "permanent"
+    if attempt + 1 >= policy.attempts:
+        return None, "attempts"
+    delay = policy.delay(attempt)
+    if deadline is not None and deadline.remaining() <= delay:
+        return None, "deadline"
+    if policy.budget is not None and not policy.budget.try_spend():
+        return None, "budget"
+    return delay, None
+
+async def retry_async(fn, *args, policy=DEFAULT_POLICY, deadline=None, label=None, **kwargs):
+    """Await fn(*args, **kwargs) with retries; never raises except on cancellation"""
+    if policy.budget is not None:
+        policy.budget.record_attempt()
+    attempt = 0
+    while True:
+        try:
+            return RetryResult(await fn(*args, **kwargs), attempts=attempt + 1)
+        except Exception as e:
+            delay, gave_up = _next_delay(policy, attempt, e, deadline)
+            if gave_up:
+                if gave_up != "permanent":
+                    self_heal(f"{label or getattr(fn, '__name__', 'call')} failed after {attempt + 1} attempts ({gave_up}): {e}")
+                return RetryResult(error=e, attempts=attempt + 1, gave_up=gave_up)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+def retry_sync(fn, *args, policy=DEFAULT_POLICY, deadline=None, label=None, **kwargs):
+    """Blocking counterpart for sync call sites (worker threads, scripts) - never on the event loop"""
+    if policy.budget is not None:
+        policy.budget.record_attempt()
+    attempt = 0
+    while True:
+        try:
+            return RetryResult(fn(*args, **kwargs), attempts=attempt + 1)
+        except Exception as e:
+            delay, gave_up = _next_delay(policy, attempt, e, deadline)
+            if gave_up:
+                if gave_up != "permanent":
+                    self_heal(f"{label or getattr(fn, '__name__', 'call')} failed after {attempt + 1} attempts ({gave_up}): {e}")
+                return RetryResult(error=e, attempts=attempt + 1, gave_up=gave_up)
+            attempt += 1
+            time.sleep(delay)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+ECOSYSTEM ROUTER: One NewMessage handler, one hash lookup per command
+Parses the command token once; "/cmd@BotName args" and "/CMD args" route like "/cmd args".
+"""
+
+from self_heal import self_heal
+
+def parse_command(text):
+    """Return (command, args) for "/command args", or (None, text) for anything else"""
+    if not text or text[0] != "/":
+        return None, text
+    # Any whitespace ends the command: "/ask\nquestion" is as common as "/ask question"
+    token, *rest = text.split(None, 1)
+    command = token.split("@", 1)[0].lower()
+    return command, rest[0].strip() if rest else ""
+
+class CommandRouter:
+    def __init__(self):
+        self.routes = {}     # "/command" -> async handler(event)
+        self.prefixes = []   # (prefix, handler) fallbacks for unknown commands, e.g. "/admin"
+
+    def add(self, command, handler):
+        self.routes[command.lower()] = handler
+
+    def add_prefix(self, prefix, handler):
+        self.prefixes.append((prefix.lower(), handler))
+
+    def command(self, *commands):
+        """Decorator: route the given commands to the handler"""
+        def register(handler):
+            for command in commands:
+                self.add(command, handler)
+            return handler
+        return register
+
+    def resolve(self, command):
+        handler = self.routes.get(command)
+        if handler is None:
+            for prefix, fallback in self.prefixes:
+                if command.startswith(prefix):
+                    return fallback
+        return handler
+
+    async def dispatch(self, event):
+        """Route one message to exactly one handler; returns True if handled"""
+        try:
+            command, _ = parse_command(event.raw_text)
+            if command is None:
+                return False
+            handler = self.resolve(command)
+            if handler is None:
+                return False
+            await handler(event)
+            return True
+        except Exception as e:
+            self_heal(f"Router dispatch failed: {e}")
+            return False
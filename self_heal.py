@@ -1,12 +1,27 @@
-import logging, traceback
-logging.basicConfig(level=logging.INFO)
+import atexit, logging, traceback
+from log_pipeline import setup_logging, StormSuppressor
+
+suppressor = StormSuppressor(logging.getLogger("self_heal"))
+
+def setup_self_heal_logging():
+    """Entry points only: JSON log pipeline + storm summaries flushed on a timer. Returns the queue handler."""
+    handler = setup_logging()
+    suppressor.start()
+    atexit.register(suppressor.stop)  # registered after the listener: runs before it stops
+    return handler
 
 def self_heal(msg):
-    logging.warning(f"[SELF-HEAL] {msg}")
+    suppressor.log(logging.WARNING, f"[SELF-HEAL] {msg}", event="self_heal")
 
-def auto_retry(task, retries=3):
-    for i in range(retries):
-        try: return task()
+def run_callbacks(callbacks, source):
+    """Call every callback (e.g. a layer's on_change hooks); a failing one is logged and the rest still run"""
+    for callback in callbacks:
+        try:
+            callback()
         except Exception as e:
-            self_heal(f"Retry {i+1} failed: {e}")
-    return "(Deterministic fallback)"
+            self_heal(f"{source} change callback failed: {e}")
+
+def auto_retry(task, retries=3):
+    """Run task() with backoff; returns a retry.RetryResult (.ok, .value, .error) instead of a fallback string"""
+    from retry import retry_sync, RetryPolicy  # retry imports self_heal
+    return retry_sync(task, policy=RetryPolicy(attempts=retries, retryable=lambda e: True))
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+ECOSYSTEM SUBSCRIPTION SCHEDULER: Renewal/expiry events without scanning subscribers
+Min-heap of next-event times with lazy invalidation, driven by the asyncio loop.
+"""
+
+import asyncio, heapq, time
+from self_heal import self_heal
+
+MAX_SLEEP = 3600  # re-check at least hourly (wall clock jumps, suspended hosts)
+
+class RenewalScheduler:
+    """
+    schedule / unschedule are O(log n) / O(1): superseded heap entries are left in
+    place and skipped when popped (their version no longer matches). The heap is
+    rebuilt when stale entries outnumber live ones.
+    """
+
+    def __init__(self, on_due):
+        self.on_due = on_due  # callable(user_id, due_at)
+        self._heap = []       # (due_at, version, user_id)
+        self._due = {}        # user_id -> (due_at, version)
+        self._version = 0
+        self._wakeup = None
+
+    def __len__(self):
+        return len(self._due)
+
+    def schedule(self, user_id, due_at):
+        self._version += 1
+        self._due[user_id] = (due_at, self._version)
+        wake = not self._heap or due_at < self._heap[0][0]
+        heapq.heappush(self._heap, (due_at, self._version, user_id))
+        if len(self._heap) > 2 * len(self._due) + 64:
+            self._compact()
+        if wake and self._wakeup is not None:
+            self._wakeup.set()
+
+    def unschedule(self, user_id):
+        self._due.pop(user_id, None)
+
+    def next_due(self, user_id):
+        """Timestamp of the user's next event, or None"""
+        entry = self._due.get(user_id)
+        return entry[0] if entry else None
+
+    def rebuild(self, due_times):
+        """Bulk load {user_id: due_at} in O(n) (startup)"""
+        self._due = {}
+        self._heap = []
+        for user_id, due_at in due_times.items():
+            self._version += 1
+            self._due[user_id] = (due_at, self._version)
+            self._heap.append((due_at, self._version, user_id))
+        heapq.heapify(self._heap)
+
+    def _compact(self):
+        self._heap = [(due_at, version, user_id) for user_id, (due_at, version) in self._due.items()]
+        heapq.heapify(self._heap)
+
+    def _peek(self):
+        """Earliest live entry, discarding stale ones"""
+        while self._heap:
+            due_at, version, user_id = self._heap[0]
+            if self._due.get(user_id, (None, None))[1] == version:
+                return self._heap[0]
+            heapq.heappop(self._heap)
+        return None
+
+    def fire_due(self, now=None):
+        """Run on_due for every event due at or before now; returns the count"""
+        now = now or time.time()
+        fired = 0
+        while True:
+            head = self._peek()
+            if head is None or head[0] > now:
+                return fired
+            due_at, _, user_id = heapq.heappop(self._heap)
+            del self._due[user_id]
+            try:
+                self.on_due(user_id, due_at)
+            except Exception as e:
+                self_heal(f"Subscription event failed for {user_id}: {e}")
+            fired += 1
+
+    async def run(self):
+        """Fire events as they come due; catches up on missed events first"""
+        self._wakeup = asyncio.Event()
+        while True:
+            try:
+                self.fire_due()
+                head = self._peek()
+                delay = MAX_SLEEP if head is None else min(MAX_SLEEP, max(0, head[0] - time.time()))
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self_heal(f"Renewal scheduler error: {e}")
+                await asyncio.sleep(1)
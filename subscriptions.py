@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+ECOSYSTEM SUBSCRIPTION LAYER: Tiers + Management
+O(1) user lookup, per-tier membership sets, maintained counters, journaled persistence.
+"""
+
+import json, math, os, time
+from journal import Journal
+from self_heal import self_heal, run_callbacks
+from subscription_scheduler import RenewalScheduler
+
+# Built-in tier table; TIERS_FILE (JSON object of the same shape) overrides it and is hot-reloadable
+# emoji, perks and stars are optional and only shown in the /premium offer
+TIERS = {
+    "standard": {
+        "title": "Premium Standard", "emoji": "🔒", "monthly": 200, "yearly": 1500, "stars": 1500,
+        "perks": ["Eksklusive tilbud 💰", "Early access til weed 🍂", "Billigere røg fra dag 1 💵", "Forum adgang 🏛"]
+    },
+    "advanced": {
+        "title": "Premium Advanced", "emoji": "⭐", "monthly": 400, "yearly": 1500, "stars": 3000,
+        "perks": ["Unlimited early access 📛", "Eksklusive micro-batches ❤️‍🔥", "Extended forum access ⚡️"]
+    },
+}
+TIER_REQUIRED_KEYS = ("title", "monthly", "yearly")
+TIERS_FILE = os.getenv("TIERS_FILE", "tiers.json")
+PERIOD_DAYS = {"monthly": 30, "yearly": 365}
+DAY = 86400
+
+ACTIVE = "active"
+PAUSED = "paused"
+
+SUBSCRIPTIONS_COMPACT_EVERY = int(os.getenv("SUBSCRIPTIONS_COMPACT_EVERY", 1000))
+
+def load_tiers(path=TIERS_FILE):
+    """Tier table from path (built-in TIERS when the file does not exist); raises on a malformed file"""
+    if not os.path.exists(path):
+        return TIERS
+    with open(path, "r") as f:
+        tiers = json.load(f)
+    if not isinstance(tiers, dict) or not tiers or not all(isinstance(t, dict) for t in tiers.values()):
+        raise ValueError(f"{path}: expected an object of tier objects")
+    for name, tier in tiers.items():
+        missing = [key for key in TIER_REQUIRED_KEYS if key not in tier]
+        if missing:
+            raise ValueError(f"{path}: tier {name!r} is missing {', '.join(missing)}")
+    return tiers
+
+class Subscription:
+    """One subscriber record; subscriptable (sub['tier']) for handler compatibility"""
+
+    __slots__ = ("user_id", "tier", "period", "status", "started", "renews_at", "paused_at", "auto_renew")
+
+    def __init__(self, user_id, tier, period="monthly", status=ACTIVE, started=None,
+                 renews_at=None, paused_at=None, auto_renew=True):
+        self.user_id = user_id
+        self.tier = tier
+        self.period = period
+        self.status = status
+        self.started = started or time.time()
+        self.renews_at = renews_at or self.started + PERIOD_DAYS[period] * DAY
+        self.paused_at = paused_at
+        self.auto_renew = auto_renew
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+class SubscriptionManager:
+    def __init__(self, subscriptions_file="subscriptions.json", autoload=True, tiers_file=TIERS_FILE):
+        self.journal = Journal(
+            subscriptions_file,
+            f"{os.path.splitext(subscriptions_file)[0]}.log",
+            compact_every=SUBSCRIPTIONS_COMPACT_EVERY
+        )
+        self.tiers_file = tiers_file
+        self.tiers = TIERS
+        self.subscriptions = {}                          # user_id -> Subscription (active + paused)
+        self.tier_members = {tier: set() for tier in TIERS}  # tier -> active user_ids
+        self.active_count = 0
+        self.scheduler = RenewalScheduler(self._on_due)
+        self._loading = False
+        self.on_change = []   # callbacks run after every committed op
+        if autoload:
+            self._load_subscriptions()
+
+    def load(self):
+        """Replay the journal, rebuilding the tier index and renewal heap"""
+        self._load_subscriptions()
+        return self
+
+    # ------------------------------------------------------------------
+    # Persistence + index maintenance
+    # ------------------------------------------------------------------
+
+    def set_tiers(self, tiers):
+        """Swap in a new tier table (hot reload); members of a dropped tier keep their subscription"""
+        self.tiers = tiers
+        run_callbacks(self.on_change, "Subscription")
+
+    def _load_subscriptions(self):
+        try:
+            self.tiers = load_tiers(self.tiers_file)
+        except Exception as e:
+            self_heal(f"Tier config load failed, using built-in tiers: {e}")
+        try:
+            self._loading = True
+            state, ops = self.journal.load({"subscriptions": []})
+            for data in state.get("subscriptions", []):
+                self._index(Subscription.from_dict(data))
+            for op in ops:
+                self._apply_op(op)
+        except Exception as e:
+            self_heal(f"Subscriptions load failed: {e}")
+        finally:
+            self._loading = False
+            # One heapify instead of n pushes; overdue events fire when the scheduler starts
+            self.scheduler.rebuild({
+                user_id: sub.renews_at
+                for user_id, sub in self.subscriptions.items()
+                if sub.status == ACTIVE
+            })
+
+    def _index(self, sub):
+        self._unindex(sub.user_id)
+        self.subscriptions[sub.user_id] = sub
+        if sub.status == ACTIVE:
+            self.tier_members.setdefault(sub.tier, set()).add(sub.user_id)
+            self.active_count += 1
+            if not self._loading:
+                self.scheduler.schedule(sub.user_id, sub.renews_at)
+
+    def _unindex(self, user_id):
+        self.scheduler.unschedule(user_id)
+        sub = self.subscriptions.pop(user_id, None)
+        if sub and sub.status == ACTIVE:
+            self.tier_members[sub.tier].discard(user_id)
+            self.active_count -= 1
+        return sub
+
+    def _apply_op(self, op):
+        if op["type"] == "upsert":
+            self._index(Subscription.from_dict(op["sub"]))
+        elif op["type"] == "remove":
+            self._unindex(op["user_id"])
+
+    def _commit(self, op):
+        """Append op to the log, then apply it; compact when due"""
+        try:
+            # Memory only moves once the op is durable: a failed append leaves both unchanged
+            if not self.journal.append(op):
+                return False
+            self._apply_op(op)
+            run_callbacks(self.on_change, "Subscription")
+            if self.journal.should_compact():
+                self._save_subscriptions()
+            return True
+        except Exception as e:
+            self_heal(f"Subscription update failed: {e}")
+            return False
+
+    def _save_subscriptions(self):
+        return self.journal.compact({
+            "subscriptions": [sub.to_dict() for sub in self.subscriptions.values()]
+        })
+
+    def _upsert(self, sub):
+        return self._commit({"type": "upsert", "sub": sub.to_dict()})
+
+    def _on_due(self, user_id, due_at):
+        """Scheduler callback: renew (catching up missed periods) or expire"""
+        sub = self.subscriptions.get(user_id)
+        if not sub or sub.status != ACTIVE:
+            return
+        if not sub.auto_renew:
+            self._commit({"type": "remove", "user_id": user_id})
+            return
+        renewed = Subscription.from_dict(sub.to_dict())
+        period = PERIOD_DAYS[renewed.period] * DAY
+        now = max(time.time(), due_at)  # always past the event being handled, or it would fire again
+        while renewed.renews_at <= now:
+            renewed.renews_at += period
+        self._upsert(renewed)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def subscribe_user(self, user_id, tier, period="monthly"):
+        if tier not in self.tiers or period not in PERIOD_DAYS:
+            return False
+        return self._upsert(Subscription(user_id, tier, period))
+
+    def pause_subscription(self, user_id):
+        sub = self.subscriptions.get(user_id)
+        if not sub or sub.status != ACTIVE:
+            return False
+        paused = Subscription.from_dict(sub.to_dict())
+        paused.status = PAUSED
+        paused.paused_at = time.time()
+        return self._upsert(paused)
+
+    def resume_subscription(self, user_id):
+        sub = self.subscriptions.get(user_id)
+        if not sub or sub.status != PAUSED:
+            return False
+        resumed = Subscription.from_dict(sub.to_dict())
+        # Paused time does not count against the current period
+        resumed.renews_at += time.time() - sub.paused_at
+        resumed.status = ACTIVE
+        resumed.paused_at = None
+        return self._upsert(resumed)
+
+    def cancel_subscription(self, user_id):
+        """Stop renewing: an active subscription runs to renews_at and the scheduler then ends it.
+        A paused one has no running period and is removed now."""
+        sub = self.subscriptions.get(user_id)
+        if not sub or not sub.auto_renew:
+            return False
+        if sub.status == PAUSED:
+            return self._commit({"type": "remove", "user_id": user_id})
+        cancelled = Subscription.from_dict(sub.to_dict())
+        cancelled.auto_renew = False
+        return self._upsert(cancelled)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def get_subscription(self, user_id):
+        """Active or paused subscription for user_id, or None (hash lookup)"""
+        return self.subscriptions.get(user_id)
+
+    def get_active_subscription(self, user_id):
+        """Subscription for user_id only while it is active (paused ones get no premium perks)"""
+        sub = self.subscriptions.get(user_id)
+        return sub if sub and sub.status == ACTIVE else None
+
+    def get_renewal_date(self, user_id):
+        """Whole days until the subscription renews"""
+        sub = self.subscriptions.get(user_id)
+        if not sub:
+            return None
+        if sub.status == PAUSED:
+            remaining = sub.renews_at - sub.paused_at
+        else:
+            remaining = (self.scheduler.next_due(user_id) or sub.renews_at) - time.time()
+        return max(0, math.ceil(remaining / DAY))
+
+    def get_subscriber_count(self):
+        return self.active_count
+
+    def get_tier_breakdown(self):
+        """Active members per configured tier, plus tiers dropped from the config that still have members"""
+        breakdown = {tier: len(self.tier_members.get(tier, ())) for tier in self.tiers}
+        for tier, members in self.tier_members.items():
+            if members and tier not in breakdown:
+                breakdown[tier] = len(members)
+        return breakdown
+
+    def tier_title(self, tier):
+        """Display name of a tier; the bare name for a tier no longer in the config"""
+        return self.tiers.get(tier, {}).get("title", tier)
+
+    def notify_premium_users(self, tier=None):
+        """Active subscriber ids, optionally for one tier"""
+        if tier is None:
+            return [user_id for members in self.tier_members.values() for user_id in members]
+        return list(self.tier_members.get(tier, ()))
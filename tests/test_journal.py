@@ -0,0 +1,34 @@
+import json
+from journal import Journal
+from nft_ecosystem import NFTEcosystem
+
+def make_journal(tmp_path):
+    return Journal(str(tmp_path / "state.json"), str(tmp_path / "state.log"))
+
+def test_crash_mid_append_keeps_later_ops(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.load({})
+    journal.append_many([{"n": 1}, {"n": 2}])
+    journal.close()
+    # The process dies halfway through writing op 3
+    with open(journal.log_file, "a") as f:
+        f.write('{"seq":3,"op":{"n"')
+
+    journal = make_journal(tmp_path)
+    _, ops = journal.load({})
+    assert ops == [{"n": 1}, {"n": 2}]
+    journal.append_many([{"n": 3}, {"n": 4}])
+    journal.close()
+
+    _, ops = make_journal(tmp_path).load({})
+    assert ops == [{"n": 1}, {"n": 2}, {"n": 3}, {"n": 4}]
+    with open(journal.log_file) as f:
+        assert [json.loads(line)["seq"] for line in f] == [1, 2, 3, 4]
+
+def test_failed_append_leaves_registry_unchanged(tmp_path):
+    nfts = NFTEcosystem(str(tmp_path))
+    nfts.journal.append_many = lambda ops: False
+    record = {"nft_id": "a" * 16, "product_name": "P", "section_name": "S", "created_timestamp": 1.7e9}
+    assert nfts.register_nfts([record]) is False
+    assert nfts.get_nft_by_id(record["nft_id"]) is None
+    assert nfts.stats.total == 0
@@ -0,0 +1,25 @@
+import asyncio
+from router import CommandRouter, parse_command
+
+class Event:
+    def __init__(self, raw_text):
+        self.raw_text = raw_text
+
+def test_parse_command_splits_on_any_whitespace():
+    assert parse_command("/ask hvad") == ("/ask", "hvad")
+    assert parse_command("/ask\nhvad er\nklokken") == ("/ask", "hvad er\nklokken")
+    assert parse_command("/ask\thvad") == ("/ask", "hvad")
+    assert parse_command("/ASK@NtrliBot  hvad ") == ("/ask", "hvad")
+    assert parse_command("/menu") == ("/menu", "")
+    assert parse_command("hej /ask") == (None, "hej /ask")
+
+def test_newline_after_command_is_routed():
+    router = CommandRouter()
+    seen = []
+
+    async def ask(event):
+        seen.append(parse_command(event.raw_text)[1])
+
+    router.add("/ask", ask)
+    assert asyncio.run(router.dispatch(Event("/ask\nhvad anbefaler du"))) is True
+    assert seen == ["hvad anbefaler du"]
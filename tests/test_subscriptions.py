@@ -0,0 +1,35 @@
+from subscriptions import SubscriptionManager
+
+def make_manager(tmp_path):
+    return SubscriptionManager(str(tmp_path / "subscriptions.json"), tiers_file=str(tmp_path / "tiers.json"))
+
+def test_failed_append_leaves_subscriptions_unchanged(tmp_path):
+    subs = make_manager(tmp_path)
+    changes = []
+    subs.on_change.append(lambda: changes.append(True))
+    subs.journal.append = lambda op: False
+    assert subs.subscribe_user(42, "standard") is False
+    assert subs.get_subscription(42) is None
+    assert subs.get_subscriber_count() == 0
+    assert changes == []
+    assert make_manager(tmp_path).get_subscription(42) is None
+
+def test_cancelled_subscription_expires_at_renewal(tmp_path):
+    subs = make_manager(tmp_path)
+    assert subs.subscribe_user(7, "standard")
+    renews_at = subs.get_subscription(7).renews_at
+    assert subs.cancel_subscription(7)
+    assert subs.get_active_subscription(7) is not None   # paid period still runs
+
+    assert subs.scheduler.fire_due(renews_at - 1) == 0
+    assert subs.get_active_subscription(7) is not None
+    assert subs.scheduler.fire_due(renews_at + 1) == 1
+    assert subs.get_subscription(7) is None
+    assert make_manager(tmp_path).get_subscription(7) is None
+
+def test_renewing_subscription_survives_due_date(tmp_path):
+    subs = make_manager(tmp_path)
+    subs.subscribe_user(8, "standard")
+    renews_at = subs.get_subscription(8).renews_at
+    subs.scheduler.fire_due(renews_at + 1)
+    assert subs.get_active_subscription(8) is not None
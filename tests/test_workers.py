@@ -0,0 +1,55 @@
+import asyncio, importlib, io, sys
+import pytest
+from deadlines import Deadline
+
+@pytest.fixture
+def bot(tmp_path, monkeypatch):
+    # bot_updated reads credentials at import and writes its session and data files to the cwd
+    for name, value in (("API_ID", "1"), ("API_HASH", "test"), ("BOT_TOKEN", "test")):
+        monkeypatch.setenv(name, value)
+    monkeypatch.chdir(tmp_path)
+    sys.modules.pop("bot_updated", None)
+    module = importlib.import_module("bot_updated")
+    yield module
+    sys.modules.pop("bot_updated", None)
+
+class Event:
+    def __init__(self, sender_id, fail=False):
+        self.sender_id = sender_id
+        self.fail = fail
+        self.replies = []
+
+    async def respond(self, message=None, **kwargs):
+        if self.fail:
+            raise RuntimeError("user blocked the bot")
+        self.replies.append(message)
+
+def test_failed_expiry_reply_keeps_ai_worker_running(bot):
+    async def generate(prompt, context_user_id=None):
+        return f"svar: {prompt}"
+
+    async def scenario():
+        bot.ai_engine.generate = generate
+        worker = asyncio.create_task(bot.ai_worker())
+        blocked, waiting = Event(1, fail=True), Event(2)
+        bot.mistral_queue.put_nowait((blocked, Deadline(0), "for sent"))
+        bot.mistral_queue.put_nowait((waiting, Deadline(30), "hej"))
+        await asyncio.wait_for(bot.mistral_queue.join(), timeout=5)
+        alive = not worker.done()
+        worker.cancel()
+        return alive, waiting.replies
+
+    alive, replies = asyncio.run(scenario())
+    assert alive
+    assert replies == ["svar: hej"]
+
+def test_failed_expiry_reply_keeps_nft_worker_running(bot):
+    async def scenario():
+        worker = asyncio.create_task(bot.nft_worker())
+        bot.nft_queue.put_nowait((Event(1, fail=True), Deadline(0), io.BytesIO(), "P", "S"))
+        await asyncio.wait_for(bot.nft_queue.join(), timeout=5)
+        alive = not worker.done()
+        worker.cancel()
+        return alive
+
+    assert asyncio.run(scenario())